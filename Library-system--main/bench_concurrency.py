@@ -0,0 +1,110 @@
+"""
+Name: Replace with your name
+Date: 2025-11-19
+Assignment: Library System - bench_concurrency.py
+
+Stress benchmark for ConcurrentLibrary: desk threads lend and return a small,
+hotly contended set of books while every change is fsynced to the journal.
+Checks that no book ever ends up lent twice and reports throughput per
+number of desks.
+Run: python bench_concurrency.py [ops_per_desk] [books]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import List, Tuple
+from concurrency import ConcurrentLibrary
+from library import Library
+
+DESKS = (1, 2, 4, 8, 16)
+MEMBERS = 500
+
+
+def build(directory: str, books: int) -> ConcurrentLibrary:
+    lib = ConcurrentLibrary(os.path.join(directory, "books.json"), os.path.join(directory, "members.json"),
+                            journal_file=os.path.join(directory, "library.journal"), compact_every=10 ** 9)
+    lib.load_data()
+    # only the measured lends and returns pay for fsync
+    lib.storage.journal.fsync = False
+    for i in range(books):
+        lib.add_book(f"Title {i}", f"Author {i % 10}", f"isbn-{i}")
+    for i in range(MEMBERS):
+        lib.register_member(f"Member {i}", f"M{i}")
+    lib.storage.journal.fsync = True
+    return lib
+
+
+def desk(lib: ConcurrentLibrary, seed: int, ops: int, books: int, counts: List[int]) -> None:
+    rng = random.Random(seed)
+    lent = returned = 0
+    for _ in range(ops):
+        member_id = f"M{rng.randrange(MEMBERS)}"
+        isbn = f"isbn-{rng.randrange(books)}"
+        if lib.lend_book(member_id, isbn).startswith("Book '"):
+            lent += 1
+        elif lib.take_return(member_id, isbn).startswith("Book '"):
+            returned += 1
+    counts[seed] = lent - returned
+
+
+def check(lib: Library, outstanding: int) -> List[str]:
+    """Every copy on loan has exactly one holder, and the counts add up."""
+    holders = {}
+    for member in lib.members.values():
+        for isbn in member.borrowed_books:
+            holders.setdefault(isbn, []).append(member.member_id)
+    problems = []
+    for book in lib.books.values():
+        who = holders.get(book.isbn, [])
+        if len(who) != book.on_loan:
+            problems.append(f"{book.isbn}: {book.on_loan} copies on loan, held by {who}")
+    borrowed = sum(b.on_loan for b in lib.books.values())
+    if borrowed != outstanding:
+        problems.append(f"{borrowed} books borrowed, but desks lent {outstanding} more than they took back")
+    return problems + lib.verify_stats()
+
+
+def run(desks: int, ops: int, books: int) -> Tuple[float, float, List[str]]:
+    with tempfile.TemporaryDirectory() as directory:
+        lib = build(directory, books)
+        counts = [0] * desks
+        threads = [threading.Thread(target=desk, args=(lib, i, ops, books, counts)) for i in range(desks)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        batches, records = lib.writer.batches, lib.writer.records
+        problems = check(lib, sum(counts))
+        lib.close()
+
+        # what was persisted must be the same state again
+        reloaded = Library(lib.storage.books_file, lib.storage.members_file, journal_file=lib.storage.journal.path)
+        reloaded.load_data()
+        problems += [f"after reload: {p}" for p in check(reloaded, sum(counts))]
+        reloaded.close()
+    return desks * ops / elapsed, records / batches if batches else 0.0, problems
+
+
+def main():
+    ops = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    books = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    print(f"{ops} lend/return attempts per desk, {books} books, {MEMBERS} members, fsync on every write")
+    print(f"{'desks':>5} {'ops/s':>10} {'writes/fsync':>13}  result")
+    failed = False
+    for desks in DESKS:
+        throughput, group, problems = run(desks, ops, books)
+        failed = failed or bool(problems)
+        print(f"{desks:>5} {throughput:>10.0f} {group:>13.1f}  {'ok' if not problems else 'FAILED'}")
+        for problem in problems[:10]:
+            print(f"      {problem}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
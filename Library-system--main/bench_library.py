@@ -0,0 +1,182 @@
+"""
+Name: Replace with your name
+Date: 2025-11-19
+Assignment: Library System - bench_library.py
+
+Benchmark suite: times the main Library operations on synthetic data and
+prints the results as JSON, so runs can be compared between commits.
+Each scale runs in its own process, so peak RSS is that scale's alone.
+Run: python bench_library.py [--scales 1k,100k,1m] [--storage json|lazy|sqlite] [--out results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+from library import Library
+from snapshot import write_snapshot
+from storage import SqliteStorage, BOOKS_FILE, MEMBERS_FILE, JOURNAL_FILE, COMPACT_EVERY
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SCALES = {"1k": 1000, "100k": 100000, "1m": 1000000}
+SEED = 20251119
+WORDS = ("python", "data", "history", "war", "ocean", "garden", "night", "river", "empire", "code",
+         "music", "winter", "city", "stars", "island", "machine", "silver", "forest", "light", "journey")
+
+
+def generate(directory: str, count: int, seed: int = SEED) -> None:
+    """Write books.json and members.json with `count` books and `count` members."""
+    rng = random.Random(seed)
+
+    def books():
+        for i in range(count):
+            title = " ".join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(1, 4)))
+            yield {"title": f"{title} {i}", "author": f"Author {rng.randrange(max(1, count // 100))}",
+                   "isbn": str(9780000000000 + i), "available": True, "borrow_count": rng.randrange(50)}
+
+    members = ({"name": f"Member {i}", "member_id": f"M{i:07d}", "borrowed_books": []} for i in range(count))
+    write_snapshot(os.path.join(directory, BOOKS_FILE), "books", 1, books())
+    write_snapshot(os.path.join(directory, MEMBERS_FILE), "members", 1, members, index_field="member_id")
+
+
+def open_library(directory: str, storage: str, compact_every: int) -> Library:
+    if storage == "sqlite":
+        return Library(storage=SqliteStorage(os.path.join(directory, "library.db")))
+    return Library(os.path.join(directory, BOOKS_FILE), os.path.join(directory, MEMBERS_FILE),
+                   journal_file=os.path.join(directory, JOURNAL_FILE), compact_every=compact_every,
+                   lazy_members=storage == "lazy")
+
+
+def peak_rss_kb() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # bytes on macOS, KiB elsewhere
+
+
+def summarize(latencies_ns: List[int]) -> Dict:
+    """Throughput and latency percentiles (microseconds) for one operation."""
+    ordered = sorted(latencies_ns)
+    total = sum(ordered)
+
+    def pct(fraction):
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] / 1000, 2)
+
+    return {
+        "ops": len(ordered),
+        "seconds": round(total / 1e9, 6),
+        "ops_per_sec": round(len(ordered) / (total / 1e9), 1) if total else None,
+        "p50_us": pct(0.50),
+        "p90_us": pct(0.90),
+        "p99_us": pct(0.99),
+        "max_us": round(ordered[-1] / 1000, 2),
+    }
+
+
+def timed(call: Callable, args_list: List[tuple]) -> Dict:
+    clock = time.perf_counter_ns
+    latencies = []
+    for args in args_list:
+        start = clock()
+        call(*args)
+        latencies.append(clock() - start)
+    return summarize(latencies)
+
+
+def run_scale(directory: str, count: int, storage: str, ops: int, compact_every: int) -> Dict:
+    """Benchmark one prepared data directory (runs in the child process)."""
+    rng = random.Random(SEED)
+    results: Dict[str, Dict] = {}
+    lib = open_library(directory, storage, compact_every)
+
+    results["load_data"] = timed(lib.load_data, [()])
+    results["load_data"]["records_per_sec"] = round(2 * count / (results["load_data"]["seconds"] or 1e-9), 1)
+    rss_after_load = peak_rss_kb()
+
+    # first report and first search build their structures with a full scan
+    results["library_report_first"] = timed(lib.library_report, [()])
+    results["library_report"] = timed(lib.library_report, [()] * min(ops, 1000))
+
+    ops = min(ops, count)
+    isbns = [str(9780000000000 + i) for i in rng.sample(range(count), ops)]
+    loans = [(f"M{rng.randrange(count):07d}", isbn) for isbn in isbns]
+    results["lend_book"] = timed(lib.lend_book, loans)
+    results["take_return"] = timed(lib.take_return, loans)
+
+    results["search_first"] = timed(lib.search_books, [("python",)])
+    results["search_books"] = timed(lib.search_books, [(" ".join(rng.sample(WORDS, 2)),) for _ in range(200)])
+    results["find_books_by_title_prefix"] = timed(
+        lib.find_books_by_title_prefix, [(rng.choice(WORDS)[:3],) for _ in range(200)])
+    results["find_books_by_author"] = timed(
+        lib.find_books_by_author, [(f"Author {rng.randrange(max(1, count // 100))}",) for _ in range(200)])
+
+    results["list_all_books"] = timed(lib.list_all_books, [()] * max(1, min(20, 1000000 // count)))
+    results["save_data"] = timed(lib.save_data, [()] * 3)
+    lib.close()
+    return {"scale": count, "storage": storage, "results": results,
+            "peak_rss_after_load_kb": rss_after_load, "peak_rss_kb": peak_rss_kb()}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Library operations; prints JSON.")
+    parser.add_argument("--scales", default="1k,100k", help=f"comma-separated, from {', '.join(SCALES)}")
+    parser.add_argument("--storage", choices=("json", "lazy", "sqlite"), default="json")
+    parser.add_argument("--ops", type=int, default=10000, help="lends (and returns) timed per scale")
+    parser.add_argument("--compact-every", type=int, default=COMPACT_EVERY)
+    parser.add_argument("--out", help="write the JSON here instead of stdout")
+    parser.add_argument("--child", nargs=2, metavar=("DIR", "COUNT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_scale(args.child[0], int(args.child[1]), args.storage, args.ops, args.compact_every)
+        print(json.dumps(result))
+        return
+
+    runs = []
+    for name in args.scales.split(","):
+        count = SCALES[name.strip().lower()]
+        with tempfile.TemporaryDirectory() as directory:
+            print(f"generating {name}...", file=sys.stderr)
+            generate(directory, count)
+            if args.storage == "sqlite":
+                storage = SqliteStorage(os.path.join(directory, "library.db"))
+                storage.import_json(os.path.join(directory, BOOKS_FILE), os.path.join(directory, MEMBERS_FILE))
+                storage.close()
+            print(f"running {name}...", file=sys.stderr)
+            child = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", directory, str(count),
+                 "--storage", args.storage, "--ops", str(args.ops), "--compact-every", str(args.compact_every)],
+                capture_output=True, text=True, check=True)
+            runs.append(dict(json.loads(child.stdout.splitlines()[-1]), name=name))
+
+    report = {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+              "seed": SEED, "runs": runs}
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
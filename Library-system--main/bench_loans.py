@@ -0,0 +1,49 @@
+"""
+Name: Replace with your name
+Date: 2025-11-19
+Assignment: Library System - bench_loans.py
+
+Micro-benchmark: cost of Member.borrow_book/return_book as a member's loan count grows.
+Run: python bench_loans.py
+"""
+
+import timeit
+from member import Member
+
+
+class ListMember:
+    """Member with the old always-a-list loans, for comparison."""
+
+    def __init__(self, loans):
+        self.borrowed_books = list(loans)
+
+    def borrow_book(self, isbn):
+        if isbn not in self.borrowed_books:
+            self.borrowed_books.append(isbn)
+
+    def return_book(self, isbn):
+        if isbn in self.borrowed_books:
+            self.borrowed_books.remove(isbn)
+            return True
+        return False
+
+
+def lend_return_ns(member, repeat: int = 2000) -> float:
+    """Nanoseconds for one borrow_book + return_book of a book the member does not hold."""
+    def cycle():
+        member.borrow_book("new-isbn")
+        member.return_book("new-isbn")
+    return min(timeit.repeat(cycle, number=repeat, repeat=5)) / repeat * 1e9
+
+
+def main():
+    print(f"{'loans held':>10} {'list':>12} {'Member':>12}")
+    for loans in (1, 10, 100, 1000, 10000, 100000):
+        isbns = [f"isbn-{i}" for i in range(loans)]
+        before = lend_return_ns(ListMember(isbns))
+        after = lend_return_ns(Member("Dept", "D001", isbns))
+        print(f"{loans:>10} {before:>9.0f} ns {after:>9.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
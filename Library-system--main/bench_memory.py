@@ -0,0 +1,68 @@
+"""
+Name: Replace with your name
+Date: 2025-11-19
+Assignment: Library System - bench_memory.py
+
+Memory benchmark: bytes per Book/Member record, dict-backed vs slotted.
+Run: python bench_memory.py [records]
+"""
+
+import sys
+import tracemalloc
+from typing import Callable, Dict, List
+from book import Book
+from member import Member
+
+
+class DictBook:
+    """Book as it was before __slots__ (per-instance __dict__), for comparison."""
+
+    def __init__(self, title, author, isbn, available=True, borrow_count=0):
+        self.title = title
+        self.author = author
+        self.isbn = isbn
+        self.available = available
+        self.borrow_count = borrow_count
+
+
+class DictMember:
+    """Member as it was before __slots__, for comparison."""
+
+    def __init__(self, name, member_id, borrowed_books=None):
+        self.name = name
+        self.member_id = member_id
+        self.borrowed_books = borrowed_books if borrowed_books is not None else []
+
+
+def bytes_per_record(factory: Callable[[Dict], object], rows: List[Dict]) -> float:
+    """Average traced allocation per object built from `rows`, the way load_data() builds them."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(row) for row in rows]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # the list holding the objects is not part of the records
+    return (after - before - sys.getsizeof(objects)) / len(objects)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    # rows as they come out of the JSON decoder: every string is a fresh object
+    book_rows = [{"title": f"Title {i}", "author": "Author %d" % (i % 1000), "isbn": str(9780000000000 + i),
+                  "available": i % 3 != 0, "borrow_count": i % 50} for i in range(n)]
+    member_rows = [{"name": f"Member {i}", "member_id": f"M{i:07d}",
+                    "borrowed_books": [str(9780000000000 + i)] if i % 3 == 0 else []} for i in range(n)]
+
+    results = [
+        ("Book", bytes_per_record(lambda d: DictBook(**d), book_rows), bytes_per_record(Book.from_dict, book_rows)),
+        ("Member", bytes_per_record(lambda d: DictMember(**d), member_rows),
+         bytes_per_record(Member.from_dict, member_rows)),
+    ]
+    print(f"{n} records each")
+    print(f"{'record':<8} {'dict-backed':>12} {'slotted':>12} {'saved':>8}")
+    for name, before, after in results:
+        print(f"{name:<8} {before:>10.1f} B {after:>10.1f} B {1 - after / before:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,41 +4,94 @@ Date: 2025-11-19
 Assignment: Library System - book.py
 """
 
-from typing import Dict
+import sys
+from typing import Dict, List, Optional
 
 class Book:
-    def __init__(self, title: str, author: str, isbn: str, available: bool = True, borrow_count: int = 0):
+    """A title and its copies.
+
+    Most titles have one copy, whose barcode is the ISBN itself, and then
+    `copies` is None. Titles with several copies keep the barcodes of all of
+    them in a list. Loans are counted per title, not per barcode: `on_shelf`
+    is how many copies are in, so a loan or a return is O(1) however many
+    copies there are, but which copy a member holds is not recorded.
+    """
+
+    # no per-instance __dict__: large catalogs hold millions of these
+    __slots__ = ("title", "author", "isbn", "on_shelf", "borrow_count", "copies")
+
+    def __init__(self, title: str, author: str, isbn: str, available: int = True, borrow_count: int = 0,
+                 copies: Optional[List[str]] = None):
         self.title = title
-        self.author = author
+        # authors repeat across many books; share one string per author
+        self.author = sys.intern(author)
         self.isbn = isbn
-        self.available = available
+        # copies that can be lent; `available` is a count, or a bool for a single copy
+        self.on_shelf = int(available)
         # analytics field: how many times the book has been borrowed
         self.borrow_count = borrow_count
+        # barcodes of all copies; None for a single copy
+        self.copies: Optional[List[str]] = copies
+
+    @property
+    def available(self) -> bool:
+        """True if at least one copy can be lent."""
+        return self.on_shelf > 0
+
+    @property
+    def total_copies(self) -> int:
+        return 1 if self.copies is None else len(self.copies)
+
+    @property
+    def on_loan(self) -> int:
+        return self.total_copies - self.on_shelf
+
+    def barcodes(self) -> List[str]:
+        return [self.isbn] if self.copies is None else list(self.copies)
+
+    def add_copy(self, barcode: str) -> bool:
+        """Put a new copy on the shelf. Return False if the barcode is blank or already used."""
+        if not barcode.strip():
+            return False
+        if self.copies is None:
+            self.copies = [self.isbn]
+        if barcode in self.copies:
+            return False
+        self.copies.append(barcode)
+        self.on_shelf += 1
+        return True
 
     def borrow(self) -> bool:
-        """Mark book as borrowed if available. Return True if borrowed, else False."""
-        if not self.available:
+        """Lend a copy from the shelf. Return True if borrowed, False if none is left."""
+        if not self.on_shelf:
             return False
-        self.available = False
+        self.on_shelf -= 1
         self.borrow_count += 1
         return True
 
     def return_book(self) -> bool:
-        """Mark book as available. Return True if returned, else False."""
-        if self.available:
+        """Put a lent copy back on the shelf. Return True if returned, else False."""
+        if self.on_shelf >= self.total_copies:
             return False
-        self.available = True
+        self.on_shelf += 1
         return True
 
     def to_dict(self) -> Dict:
-        """Serialize Book to dict for JSON persistence."""
-        return {
+        """Serialize Book to dict for JSON persistence.
+
+        A single copy is written as before copies existed ("available" a
+        bool); several copies add the barcodes and make "available" a count.
+        """
+        data = {
             "title": self.title,
             "author": self.author,
             "isbn": self.isbn,
-            "available": self.available,
+            "available": self.available if self.copies is None else self.on_shelf,
             "borrow_count": self.borrow_count
         }
+        if self.copies is not None:
+            data["copies"] = self.copies
+        return data
 
     @classmethod
     def from_dict(cls, data: Dict):
@@ -47,9 +100,13 @@ class Book:
             author=data["author"],
             isbn=data["isbn"],
             available=data.get("available", True),
-            borrow_count=data.get("borrow_count", 0)
+            borrow_count=data.get("borrow_count", 0),
+            copies=data.get("copies")
         )
 
     def __str__(self):
-        status = "Available" if self.available else "Borrowed"
+        if self.copies is not None:
+            status = f"{self.on_shelf} of {len(self.copies)} copies available"
+        else:
+            status = "Available" if self.available else "Borrowed"
         return f"{self.title} by {self.author} (ISBN: {self.isbn}) - {status} (borrowed {self.borrow_count} times)"
@@ -0,0 +1,325 @@
+"""
+Name: Replace with your name
+Date: 2025-11-19
+Assignment: Library System - concurrency.py
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Hashable, Iterable, Iterator, List, Optional, Tuple
+from book import Book
+from member import Member
+from library import Library, PAGE_SIZE
+from loans import Loan
+from search import SEARCH_LIMIT
+from stats import LibraryStats
+from storage import ProgressCallback
+
+# books and members hash onto this many locks
+LOCK_STRIPES = 1024
+
+
+class LockStripes:
+    """Per-key locks from a fixed pool: each key hashes onto one of `count` locks.
+
+    hold() takes the locks for several keys in index order, so two callers
+    locking overlapping keys can never deadlock.
+    """
+
+    def __init__(self, count: int = LOCK_STRIPES):
+        self._locks = [threading.Lock() for _ in range(count)]
+
+    @contextmanager
+    def hold(self, keys: Iterable[Hashable]) -> Iterator[None]:
+        locks = [self._locks[i] for i in sorted({hash(key) % len(self._locks) for key in keys})]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+
+class PendingWrite:
+    """A change handed to the PersistenceWriter; wait() returns once it is persisted."""
+
+    __slots__ = ("op", "book", "member", "loan", "copy", "done", "error")
+
+    def __init__(self, op: Optional[str], book: Optional[Book] = None, member: Optional[Member] = None,
+                 loan: Optional[Loan] = None, copy: Optional[str] = None):
+        # op None: nothing to write (flush); "save": write a snapshot after the batch
+        self.op = op
+        self.book = book
+        self.member = member
+        self.loan = loan
+        self.copy = copy
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+    def wait(self) -> None:
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+
+
+class PersistenceWriter:
+    """The one thread that talks to the storage backend's write side.
+
+    Changes are queued by any number of threads. The writer takes everything
+    queued so far and persists it as one storage batch (one journal append, or
+    one SQLite transaction), so the cost of an fsync is shared by all the
+    changes that arrived while the previous batch was being synced.
+    """
+
+    def __init__(self, storage, lock: threading.RLock):
+        self.storage = storage
+        # guards the library's in-memory state; held while a batch is written
+        self.lock = lock
+        self.batches = 0
+        self.records = 0
+        self._queue: "queue.SimpleQueue[Optional[PendingWrite]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="library-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, op: Optional[str], book: Optional[Book] = None, member: Optional[Member] = None,
+               loan: Optional[Loan] = None, copy: Optional[str] = None) -> PendingWrite:
+        pending = PendingWrite(op, book, member, loan, copy)
+        self._queue.put(pending)
+        return pending
+
+    def flush(self) -> None:
+        """Wait until everything submitted so far is persisted."""
+        self.submit(None).wait()
+
+    def stop(self) -> None:
+        """Persist what is still queued, then end the thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            error = None
+            with self.lock:
+                # changes are queued under the same lock, so this takes every change made so far
+                batch, stop = self._drain(first)
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    error = e
+            if error is None:
+                # only this thread writes the journal, so the fsync needs no lock and
+                # the desks can queue the next batch meanwhile
+                try:
+                    self.storage.sync()
+                except Exception as e:
+                    error = e
+            for pending in batch:
+                pending.error = error
+                pending.done.set()
+            if stop:
+                return
+
+    def _drain(self, first: PendingWrite) -> Tuple[List[PendingWrite], bool]:
+        batch = [first]
+        while True:
+            try:
+                pending = self._queue.get_nowait()
+            except queue.Empty:
+                return batch, False
+            if pending is None:
+                return batch, True
+            batch.append(pending)
+
+    def _write(self, batch: List[PendingWrite]) -> None:
+        records = [p for p in batch if p.op not in (None, "save")]
+        if records:
+            self.storage.begin_batch()
+            try:
+                for pending in records:
+                    self.storage.commit(pending.op, book=pending.book, member=pending.member, loan=pending.loan,
+                                        copy=pending.copy)
+            finally:
+                self.storage.end_batch(sync=False)
+            self.batches += 1
+            self.records += len(records)
+        # a snapshot must come after every change already applied in memory has been written
+        if any(p.op == "save" for p in batch):
+            self.storage.save()
+
+
+class ConcurrentLibrary(Library):
+    """Library that many threads (desks) can use at once.
+
+    Every operation locks the books and members it names (see LockStripes) for
+    its whole duration, including the wait until its change is persisted, so
+    operations on the same book or member run one after another and reach the
+    journal in the order they happened. The check-and-update itself runs under
+    one short state lock, since the counters, leaderboards and storage mappings
+    are shared by all books; persistence is handed to a PersistenceWriter, which
+    group-commits the changes of all desks.
+
+    Counters and leaderboards are built by load_data() rather than on first
+    use, so they never have to be rebuilt from a scan while desks are running.
+    With SqliteStorage, open the database with check_same_thread=False.
+    """
+
+    def __init__(self, *args, stripes: int = LOCK_STRIPES, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.RLock()
+        self._stripes = LockStripes(stripes)
+        # per-thread list of the writes made by the operation in progress
+        self._local = threading.local()
+        self._writer = PersistenceWriter(self.storage, self._lock)
+
+    @property
+    def writer(self) -> PersistenceWriter:
+        return self._writer
+
+    def _locked(self, keys: Iterable[Hashable], operation: Callable, *args):
+        """Run `operation` holding the locks for `keys` and the state lock, then wait for its writes."""
+        local = self._local
+        if getattr(local, "pending", None) is not None:
+            # nested call (process_batch -> lend_book): the outer call holds the locks and waits
+            return operation(*args)
+        local.pending = []
+        try:
+            with self._stripes.hold(keys):
+                with self._lock:
+                    result = operation(*args)
+                for pending in local.pending:
+                    pending.wait()
+        finally:
+            local.pending = None
+        return result
+
+    def _commit(self, op: str, book: Optional[Book] = None, member: Optional[Member] = None,
+                loan: Optional[Loan] = None, copy: Optional[str] = None) -> None:
+        self._local.pending.append(self._writer.submit(op, book, member, loan, copy))
+
+    # ---- Book & Member management ----
+    def add_book(self, title: str, author: str, isbn: str) -> bool:
+        return self._locked([("book", isbn)], super().add_book, title, author, isbn)
+
+    def add_books(self, books: Iterable[Book]) -> int:
+        # too many keys to stripe-lock; the state lock alone keeps every desk out meanwhile
+        with self._lock:
+            added = self._insert_books(books)
+        if added:
+            self.save_data()
+        return added
+
+    def add_copy(self, isbn: str, barcode: Optional[str] = None) -> Optional[str]:
+        return self._locked([("book", isbn)], super().add_copy, isbn, barcode)
+
+    def register_member(self, name: str, member_id: str) -> bool:
+        return self._locked([("member", member_id)], super().register_member, name, member_id)
+
+    def find_book(self, isbn: str) -> Optional[Book]:
+        with self._lock:
+            return super().find_book(isbn)
+
+    def find_member(self, member_id: str) -> Optional[Member]:
+        with self._lock:
+            return super().find_member(member_id)
+
+    # ---- Search ----
+    def find_books_by_author(self, author: str) -> List[Book]:
+        with self._lock:
+            return super().find_books_by_author(author)
+
+    def find_books_by_title_prefix(self, prefix: str, limit: int = SEARCH_LIMIT) -> List[Book]:
+        with self._lock:
+            return super().find_books_by_title_prefix(prefix, limit)
+
+    def search_books(self, query: str, limit: int = SEARCH_LIMIT) -> List[Book]:
+        with self._lock:
+            return super().search_books(query, limit)
+
+    # ---- Lend / Return ----
+    def lend_book(self, member_id: str, isbn: str) -> str:
+        return self._locked([("member", member_id), ("book", isbn)], super().lend_book, member_id, isbn)
+
+    def take_return(self, member_id: str, isbn: str) -> str:
+        return self._locked([("member", member_id), ("book", isbn)], super().take_return, member_id, isbn)
+
+    def process_batch(self, operations: Iterable[Tuple[str, str, str]], atomic: bool = True) -> List[str]:
+        operations = list(operations)
+        keys = [("member", member_id) for member_id, _, _ in operations]
+        keys += [("book", isbn) for _, isbn, _ in operations]
+        return self._locked(keys, super().process_batch, operations, atomic)
+
+    # ---- Holds ----
+    def place_hold(self, member_id: str, isbn: str) -> str:
+        return self._locked([("member", member_id), ("book", isbn)], super().place_hold, member_id, isbn)
+
+    def cancel_hold(self, member_id: str, isbn: str) -> bool:
+        return self._locked([("member", member_id), ("book", isbn)], super().cancel_hold, member_id, isbn)
+
+    def hold_queue(self, isbn: str) -> List[str]:
+        with self._lock:
+            return super().hold_queue(isbn)
+
+    # ---- Loans ----
+    def overdue_loans(self, now: Optional[float] = None) -> List[Loan]:
+        with self._lock:
+            return super().overdue_loans(now)
+
+    def loan_history(self, member_id: Optional[str] = None, isbn: Optional[str] = None) -> List[Loan]:
+        with self._lock:
+            return super().loan_history(member_id, isbn)
+
+    # ---- Persistence ----
+    def save_data(self) -> None:
+        """Write a snapshot from the writer thread, after everything queued before it."""
+        self._writer.submit("save").wait()
+
+    def load_data(self, progress: Optional[ProgressCallback] = None) -> None:
+        """Load as Library.load_data() does; call it before any desk starts."""
+        with self._lock:
+            super().load_data(progress)
+            self._stats = LibraryStats.from_scan(self.books.values(), self.members.values())
+            self._popularity = self._scan_popularity()
+
+    def close(self) -> None:
+        self._writer.stop()
+        super().close()
+
+    # ---- Analytics ----
+    def verify_stats(self) -> List[str]:
+        # the full scan must see every change on disk (SQLite reads rows, not the objects in memory)
+        self._writer.flush()
+        with self._lock:
+            return super().verify_stats()
+
+    def top_borrowed(self, k: int = 10, author: Optional[str] = None,
+                     window: Optional[str] = None) -> List[Tuple[Book, int]]:
+        with self._lock:
+            return super().top_borrowed(k, author, window)
+
+    def library_report(self) -> str:
+        with self._lock:
+            return super().library_report()
+
+    def list_all_books(self, available_only: bool = False, author: Optional[str] = None,
+                       sort: Optional[str] = None) -> List[str]:
+        with self._lock:
+            return super().list_all_books(available_only, author, sort)
+
+    def list_all_members(self, active_only: bool = False) -> List[str]:
+        with self._lock:
+            return super().list_all_members(active_only)
+
+    def page_books(self, cursor: Optional[str] = None, limit: int = PAGE_SIZE, available_only: bool = False,
+                   author: Optional[str] = None, sort: Optional[str] = None) -> Tuple[List[Book], Optional[str]]:
+        with self._lock:
+            return super().page_books(cursor, limit, available_only, author, sort)
+
+    def page_members(self, cursor: Optional[str] = None, limit: int = PAGE_SIZE,
+                     active_only: bool = False) -> Tuple[List[Member], Optional[str]]:
+        with self._lock:
+            return super().page_members(cursor, limit, active_only)
@@ -0,0 +1,80 @@
+"""
+Name: Replace with your name
+Date: 2025-11-19
+Assignment: Library System - holds.py
+"""
+
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class HoldQueues:
+    """Per-ISBN first-come-first-served queues of member IDs waiting for a book.
+
+    Each queue is an OrderedDict used as an ordered set, so adding a hold,
+    cancelling any hold and taking the next holder are all O(1), however many
+    holds a popular title collects. position() and queue() walk the queue and
+    are O(n) in its length.
+    """
+
+    def __init__(self):
+        self._queues: Dict[str, "OrderedDict[str, None]"] = {}
+
+    def clear(self) -> None:
+        self._queues.clear()
+
+    def add(self, isbn: str, member_id: str) -> bool:
+        """Queue `member_id` for `isbn`; False if they are already queued."""
+        queue = self._queues.get(isbn)
+        if queue is None:
+            queue = self._queues[isbn] = OrderedDict()
+        elif member_id in queue:
+            return False
+        queue[member_id] = None
+        return True
+
+    def cancel(self, isbn: str, member_id: str) -> bool:
+        queue = self._queues.get(isbn)
+        if queue is None or member_id not in queue:
+            return False
+        del queue[member_id]
+        if not queue:
+            del self._queues[isbn]
+        return True
+
+    def pop_next(self, isbn: str) -> Optional[str]:
+        """Remove and return the member who has waited longest for `isbn` (None if nobody)."""
+        queue = self._queues.get(isbn)
+        if queue is None:
+            return None
+        member_id, _ = queue.popitem(last=False)
+        if not queue:
+            del self._queues[isbn]
+        return member_id
+
+    def position(self, isbn: str, member_id: str) -> Optional[int]:
+        """1-based place of `member_id` in the queue for `isbn`; walks the queue up to them."""
+        for place, queued in enumerate(self._queues.get(isbn, ()), 1):
+            if queued == member_id:
+                return place
+        return None
+
+    def queue(self, isbn: str) -> List[str]:
+        return list(self._queues.get(isbn, ()))
+
+    def count(self, isbn: str) -> int:
+        return len(self._queues.get(isbn, ()))
+
+    def load(self, rows: Iterable[List]) -> None:
+        """Add queues from rows() output: [isbn, [member_id, ...]] in queue order."""
+        for isbn, member_ids in rows:
+            for member_id in member_ids:
+                self.add(isbn, member_id)
+
+    def rows(self) -> Iterator[List]:
+        # one row per title keeps even very long queues compact on disk
+        for isbn, queue in self._queues.items():
+            yield [isbn, list(queue)]
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
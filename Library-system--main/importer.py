@@ -0,0 +1,226 @@
+"""
+Name: Replace with your name
+Date: 2025-11-19
+Assignment: Library System - importer.py
+
+Bulk catalog import from CSV (with a title,author,isbn[,copies] header) or
+JSON Lines (one {"title", "author", "isbn"[, "copies"]} object per line).
+Rows are validated on a process pool, rows that fail or repeat an ISBN go
+to a rejects file, and the catalog is saved once at the end.
+Run: python importer.py catalog.csv [--dir .] [--rejects FILE] [--workers N] [--check-isbn]
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from book import Book
+from library import Library
+from snapshot import SnapshotError
+from storage import BOOKS_FILE, MEMBERS_FILE, JOURNAL_FILE
+
+# rows handed to a worker at a time
+CHUNK_ROWS = 5000
+# most copies a single row may ask for
+MAX_COPIES = 10000
+REJECTS_SUFFIX = ".rejects.jsonl"
+
+# (line number, row): a dict for CSV, the raw line for JSON Lines
+RawRow = Tuple[int, object]
+# (validated fields or None, error or None)
+Checked = Tuple[Optional[Dict], Optional[str]]
+
+
+class ImportResult(NamedTuple):
+    read: int
+    added: int
+    duplicates: int
+    rejected: int
+
+
+def isbn_checksum_ok(isbn: str) -> bool:
+    """True if `isbn` (hyphens and spaces allowed) is an ISBN-10 or ISBN-13 with a valid check digit."""
+    digits = isbn.replace("-", "").replace(" ", "")
+    if len(digits) == 10 and digits[:9].isdigit() and (digits[9].isdigit() or digits[9] in "xX"):
+        values = [int(c) for c in digits[:9]] + [10 if digits[9] in "xX" else int(digits[9])]
+        return sum((10 - i) * v for i, v in enumerate(values)) % 11 == 0
+    if len(digits) == 13 and digits.isdigit():
+        return sum(int(c) * (3 if i % 2 else 1) for i, c in enumerate(digits)) % 10 == 0
+    return False
+
+
+def validate_row(row: object, check_isbn: bool = False) -> Tuple[Optional[Dict], Optional[str]]:
+    """(fields, None) for a usable row, (None, reason) otherwise."""
+    if isinstance(row, str):
+        try:
+            row = json.loads(row)
+        except json.JSONDecodeError:
+            return None, "not valid JSON"
+    if not isinstance(row, dict):
+        return None, "not an object"
+    fields = {}
+    for name in ("title", "author", "isbn"):
+        value = row.get(name)
+        if isinstance(value, int) and not isinstance(value, bool) and name == "isbn":
+            value = str(value)
+        if not isinstance(value, str) or not value.strip():
+            return None, f"missing {name}"
+        fields[name] = value.strip()
+    if any(c.isspace() for c in fields["isbn"]):
+        return None, "ISBN contains whitespace"
+    if check_isbn and not isbn_checksum_ok(fields["isbn"]):
+        return None, "ISBN check digit is wrong"
+    copies = row.get("copies")
+    if copies in (None, ""):
+        copies = 1
+    try:
+        copies = int(copies)
+    except (TypeError, ValueError):
+        return None, "copies is not a number"
+    if not 1 <= copies <= MAX_COPIES:
+        return None, f"copies must be between 1 and {MAX_COPIES}"
+    fields["copies"] = copies
+    return fields, None
+
+
+def validate_chunk(chunk: List[RawRow], check_isbn: bool = False) -> List[Checked]:
+    # runs in a worker process
+    return [validate_row(row, check_isbn) for _, row in chunk]
+
+
+def read_rows(path: str, fmt: Optional[str] = None) -> Iterator[RawRow]:
+    """Stream (line number, row) from a CSV or JSON Lines file, guessing the format from the extension."""
+    if fmt is None:
+        fmt = "csv" if path.lower().endswith(".csv") else "jsonl"
+    if fmt == "csv":
+        # utf-8-sig: spreadsheets often start the file with a byte order mark
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    yield line_number, line
+
+
+def _chunks(rows: Iterable[RawRow], size: int) -> Iterator[List[RawRow]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _checked_chunks(chunks: Iterable[List[RawRow]], workers: int,
+                    check_isbn: bool) -> Iterator[Tuple[List[RawRow], List[Checked]]]:
+    """(chunk, validate_chunk(chunk)) in input order, with at most 2 * workers chunks in flight."""
+    if workers <= 1:
+        for chunk in chunks:
+            yield chunk, validate_chunk(chunk, check_isbn)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(validate_chunk, chunk, check_isbn)))
+            if len(pending) >= 2 * workers:
+                done, future = pending.popleft()
+                yield done, future.result()
+        while pending:
+            done, future = pending.popleft()
+            yield done, future.result()
+
+
+def _new_book(fields: Dict) -> Book:
+    copies = fields["copies"]
+    if copies == 1:
+        return Book(title=fields["title"], author=fields["author"], isbn=fields["isbn"])
+    isbn = fields["isbn"]
+    # numbered as Library.add_copy() numbers them
+    barcodes = [isbn] + [f"{isbn}-{n}" for n in range(2, copies + 1)]
+    return Book(title=fields["title"], author=fields["author"], isbn=isbn, available=copies, copies=barcodes)
+
+
+def import_catalog(lib: Library, path: str, rejects_file: Optional[str] = None, workers: Optional[int] = None,
+                   check_isbn: bool = False, fmt: Optional[str] = None,
+                   chunk_rows: int = CHUNK_ROWS) -> ImportResult:
+    """Add the books in `path` to `lib` and save once at the end.
+
+    Rows with an ISBN already in the catalog, or seen earlier in the file, are
+    skipped as duplicates. Those and invalid rows are written to
+    `rejects_file` (default: `path` + ".rejects.jsonl") as
+    {"line", "error", "row"} objects. workers=0 validates in this process.
+    """
+    rejects_file = rejects_file or path + REJECTS_SUFFIX
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    counts = {"read": 0, "duplicates": 0, "rejected": 0}
+    rejects = None
+
+    def reject(line: int, row: object, error: str) -> None:
+        nonlocal rejects
+        if rejects is None:
+            rejects = open(rejects_file, "w", encoding="utf-8")
+        if isinstance(row, str):
+            row = row.rstrip("\n")
+        rejects.write(json.dumps({"line": line, "error": error, "row": row}, ensure_ascii=False) + "\n")
+
+    def books() -> Iterator[Book]:
+        # runs inside lib.add_books(), so the catalog check also sees the books added from this file
+        for chunk, checked in _checked_chunks(_chunks(read_rows(path, fmt), chunk_rows), workers, check_isbn):
+            counts["read"] += len(chunk)
+            for (line, row), (fields, error) in zip(chunk, checked):
+                if error is not None:
+                    counts["rejected"] += 1
+                    reject(line, row, error)
+                elif fields["isbn"] in lib.books:
+                    counts["duplicates"] += 1
+                    reject(line, row, "duplicate ISBN")
+                else:
+                    yield _new_book(fields)
+
+    try:
+        added = lib.add_books(books())
+    finally:
+        if rejects is not None:
+            rejects.close()
+    return ImportResult(counts["read"], added, counts["duplicates"], counts["rejected"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import books from a CSV or JSON Lines file.")
+    parser.add_argument("file")
+    parser.add_argument("--dir", default=".", help="directory holding books.json, members.json and the journal")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="default: from the file extension")
+    parser.add_argument("--rejects", help=f"where rejected rows go (default: FILE{REJECTS_SUFFIX})")
+    parser.add_argument("--workers", type=int, help="validating processes (default: CPU count; 0: none)")
+    parser.add_argument("--check-isbn", action="store_true", help="reject ISBN-10/13 with a wrong check digit")
+    args = parser.parse_args()
+
+    lib = Library(os.path.join(args.dir, BOOKS_FILE), os.path.join(args.dir, MEMBERS_FILE),
+                  journal_file=os.path.join(args.dir, JOURNAL_FILE), lazy_members=True)
+    try:
+        lib.load_data()
+    except SnapshotError as e:
+        print(f"Error: {e}")
+        return
+    start = time.perf_counter()
+    try:
+        result = import_catalog(lib, args.file, args.rejects, args.workers, args.check_isbn, args.format)
+    finally:
+        lib.close()
+    print(f"Read {result.read} rows in {time.perf_counter() - start:.1f}s: added {result.added}, "
+          f"{result.duplicates} duplicates, {result.rejected} invalid.")
+    if result.duplicates or result.rejected:
+        print(f"Rejected rows written to {args.rejects or args.file + REJECTS_SUFFIX}")
+
+
+if __name__ == "__main__":
+    main()
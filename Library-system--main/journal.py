@@ -0,0 +1,142 @@
+"""
+Name: Replace with your name
+Date: 2025-11-19
+Assignment: Library System - journal.py
+"""
+
+import json
+import os
+from typing import Dict, Iterator, List, MutableMapping
+from book import Book
+from member import Member
+from holds import HoldQueues
+from loans import LoanLedger
+
+
+class Journal:
+    """Append-only transaction log: one compact JSON record per line.
+
+    Appends are fsynced by default, so a committed record survives a crash;
+    fsync=False only flushes them to the OS (faster, but the last records may
+    be lost on power failure). The group-commit writer in concurrency.py
+    shares one fsync between many appends.
+    """
+
+    def __init__(self, path: str, fsync: bool = True):
+        self.path = path
+        self.fsync = fsync
+        # number of records currently in the file (since the last truncate)
+        self.count = 0
+        # bytes appended since the journal was opened
+        self.bytes_written = 0
+        self._file = None
+
+    def append(self, op: str, **fields) -> None:
+        """Write one record for operation `op` and flush it to disk (fsync unless opened with fsync=False)."""
+        record = {"op": op}
+        record.update(fields)
+        self.append_many([record])
+
+    def append_many(self, records: List[Dict], sync: bool = True) -> None:
+        """Write several records (each with an "op" key) with a single write and flush.
+
+        sync=False leaves the fsync (if enabled) to a later sync() call.
+        """
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+        self._file.write(data)
+        self.bytes_written += len(data)  # json.dumps output is ASCII
+        self._file.flush()
+        if sync:
+            self.sync()
+        self.count += len(records)
+
+    def sync(self) -> None:
+        """fsync the records appended so far, if the journal was opened with fsync."""
+        if self.fsync and self._file is not None:
+            os.fsync(self._file.fileno())
+
+    def replay(self) -> Iterator[Dict]:
+        """Yield every record in the journal, oldest first.
+
+        A torn last line (crash in the middle of an append) is skipped.
+        """
+        self.count = 0
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self.count += 1
+                yield record
+
+    def truncate(self) -> None:
+        """Drop all records, after they have been folded into a snapshot."""
+        self.close()
+        with open(self.path, "w", encoding="utf-8"):
+            pass
+        self.count = 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self) -> int:
+        return self.count
+
+
+def apply_record(books: MutableMapping[str, Book], members: MutableMapping[str, Member], record: Dict,
+                 loans: LoanLedger = None, holds: HoldQueues = None) -> None:
+    """Re-apply a journal record to in-memory books/members (and the loan ledger and holds, if given)."""
+    op = record.get("op")
+    if op == "add_book":
+        if record["isbn"] not in books:
+            books[record["isbn"]] = Book(title=record["title"], author=record["author"], isbn=record["isbn"])
+    elif op == "add_copy":
+        book = books.get(record["isbn"])
+        if book:
+            book.add_copy(record["copy"])
+            books[book.isbn] = book
+    elif op == "register_member":
+        if record["member_id"] not in members:
+            members[record["member_id"]] = Member(name=record["name"], member_id=record["member_id"])
+    elif op == "lend":
+        book = books.get(record["isbn"])
+        member = members.get(record["member_id"])
+        if book and member and book.borrow():
+            member.borrow_book(book.isbn)
+            _write_back(books, members, book, member)
+            # records written before the ledger existed carry no times
+            if loans is not None and "at" in record:
+                loans.lend(member.member_id, book.isbn, record["at"], record["due"])
+            # a book handed to a holder takes them out of the queue
+            if holds is not None:
+                holds.cancel(book.isbn, member.member_id)
+    elif op == "return":
+        book = books.get(record["isbn"])
+        member = members.get(record["member_id"])
+        if book and member and member.return_book(book.isbn):
+            book.return_book()
+            _write_back(books, members, book, member)
+            if loans is not None and "at" in record:
+                loans.close(member.member_id, book.isbn, record["at"])
+    elif op == "hold":
+        if holds is not None:
+            holds.add(record["isbn"], record["member_id"])
+    elif op == "cancel_hold":
+        if holds is not None:
+            holds.cancel(record["isbn"], record["member_id"])
+
+
+def _write_back(books, members, book: Book, member: Member) -> None:
+    # mappings that decode records on demand only keep changes that are stored back
+    books[book.isbn] = book
+    members[member.member_id] = member
@@ -0,0 +1,161 @@
+"""
+Name: Replace with your name
+Date: 2025-11-19
+Assignment: Library System - leaderboard.py
+"""
+
+import time
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+from book import Book
+
+# rolling windows for Library.top_borrowed(window=...), in seconds
+WINDOWS = {"day": 24 * 3600, "week": 7 * 24 * 3600, "month": 30 * 24 * 3600}
+# each window expires old lends in this many steps
+WINDOW_BUCKETS = 24
+
+
+class Leaderboard:
+    """Keys ranked by a count, kept ordered as counts change.
+
+    Keys are grouped in one bucket per count, and the counts that have a
+    bucket are kept sorted, so changing a count costs O(log n) in the number
+    of distinct counts and top(k) walks only as far as it needs to. Ties are
+    ranked by who reached the count first. Keys with a count of 0 are not kept.
+    """
+
+    def __init__(self):
+        self._counts: Dict[str, int] = {}
+        self._buckets: Dict[int, Dict[str, None]] = {}
+        # distinct counts that have a bucket, ascending
+        self._levels: List[int] = []
+
+    def add(self, key: str, delta: int = 1) -> None:
+        old = self._counts.get(key, 0)
+        new = old + delta
+        if old:
+            self._discard(key, old)
+        if new > 0:
+            self._counts[key] = new
+            self._insert(key, new)
+        else:
+            self._counts.pop(key, None)
+
+    def count(self, key: str) -> int:
+        return self._counts.get(key, 0)
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        """The k keys with the highest counts, highest first."""
+        result = []
+        for count in reversed(self._levels):
+            for key in self._buckets[count]:
+                if len(result) == k:
+                    return result
+                result.append((key, count))
+        return result
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def _insert(self, key: str, count: int) -> None:
+        bucket = self._buckets.get(count)
+        if bucket is None:
+            bucket = self._buckets[count] = {}
+            insort(self._levels, count)
+        bucket[key] = None
+
+    def _discard(self, key: str, count: int) -> None:
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            del self._levels[bisect_left(self._levels, count)]
+
+
+class WindowedLeaderboard:
+    """Lends per key over a rolling time window.
+
+    Lends are counted into WINDOW_BUCKETS time slices; when a slice falls out
+    of the window its counts are subtracted from the ranking again.
+    """
+
+    def __init__(self, window: float, buckets: int = WINDOW_BUCKETS):
+        self.buckets = buckets
+        self.slice = window / buckets
+        self.board = Leaderboard()
+        self._slices: Deque[Tuple[int, Dict[str, int]]] = deque()
+
+    def add(self, key: str, now: float) -> None:
+        index = int(now // self.slice)
+        self._expire(index)
+        if not self._slices or self._slices[-1][0] != index:
+            self._slices.append((index, {}))
+        counts = self._slices[-1][1]
+        counts[key] = counts.get(key, 0) + 1
+        self.board.add(key)
+
+    def top(self, k: int, now: float) -> List[Tuple[str, int]]:
+        self._expire(int(now // self.slice))
+        return self.board.top(k)
+
+    def _expire(self, index: int) -> None:
+        while self._slices and self._slices[0][0] <= index - self.buckets:
+            _, counts = self._slices.popleft()
+            for key, count in counts.items():
+                self.board.add(key, -count)
+
+
+class Popularity:
+    """All-time, per-author and rolling-window borrowing leaderboards.
+
+    All-time and per-author rankings follow Book.borrow_count. Window rankings
+    are rebuilt from the lend times in the loan ledger (see from_scan()).
+    """
+
+    def __init__(self, windows: Optional[Dict[str, float]] = None):
+        self.overall = Leaderboard()
+        self.by_author: Dict[str, Leaderboard] = {}
+        self.windows = {name: WindowedLeaderboard(seconds) for name, seconds in (windows or WINDOWS).items()}
+
+    @classmethod
+    def from_scan(cls, books: Iterable[Book], windows: Optional[Dict[str, float]] = None,
+                  lends: Iterable[Tuple[str, float]] = ()) -> "Popularity":
+        """Boards for `books`; `lends` are (isbn, lent_at) pairs, oldest first, for the windows."""
+        popularity = cls(windows)
+        for book in books:
+            if book.borrow_count:
+                popularity._count(book, book.borrow_count)
+        for isbn, lent_at in lends:
+            for board in popularity.windows.values():
+                board.add(isbn, lent_at)
+        return popularity
+
+    def lend(self, book: Book, now: Optional[float] = None) -> None:
+        self._count(book, 1)
+        now = time.time() if now is None else now
+        for board in self.windows.values():
+            board.add(book.isbn, now)
+
+    def top(self, k: int, author: Optional[str] = None, window: Optional[str] = None,
+            now: Optional[float] = None) -> List[Tuple[str, int]]:
+        """Top k (isbn, count) overall, for one author (case-insensitive), or within a named window."""
+        if author is not None and window is not None:
+            raise ValueError("rank by author or by window, not both")
+        if window is not None:
+            if window not in self.windows:
+                raise ValueError(f"unknown window {window!r}; expected one of {sorted(self.windows)}")
+            return self.windows[window].top(k, time.time() if now is None else now)
+        if author is not None:
+            board = self.by_author.get(author.casefold())
+            return board.top(k) if board is not None else []
+        return self.overall.top(k)
+
+    def _count(self, book: Book, delta: int) -> None:
+        self.overall.add(book.isbn, delta)
+        # keyed like the search index's authors, so lookups ignore case
+        author = book.author.casefold()
+        board = self.by_author.get(author)
+        if board is None:
+            board = self.by_author[author] = Leaderboard()
+        board.add(book.isbn, delta)
@@ -4,43 +4,141 @@ Date: 2025-11-19
 Assignment: Library System - library.py
 """
 
-import json
-from typing import Dict, Optional, List
+import time
+from typing import Dict, Iterable, Iterator, MutableMapping, Optional, List, Tuple
 from book import Book
 from member import Member
-import os
+from stats import LibraryStats
+from leaderboard import WINDOWS, Popularity
+from loans import DAY, LOAN_DAYS, Loan
+from search import SEARCH_LIMIT
+from metrics import INSTRUMENTED, DUMP_INTERVAL, Metrics
+from storage import JsonStorage, ProgressCallback, BOOKS_FILE, MEMBERS_FILE, JOURNAL_FILE, COMPACT_EVERY
 
-BOOKS_FILE = "books.json"
-MEMBERS_FILE = "members.json"
+# entries per page_books()/page_members() call unless told otherwise
+PAGE_SIZE = 20
 
 class Library:
-    def __init__(self, books_file: str = BOOKS_FILE, members_file: str = MEMBERS_FILE):
-        # store books as dict keyed by ISBN
-        self.books: Dict[str, Book] = {}
+    def __init__(self, books_file: str = BOOKS_FILE, members_file: str = MEMBERS_FILE,
+                 journal_file: Optional[str] = None, compact_every: int = COMPACT_EVERY,
+                 lazy_members: bool = False, storage=None, loans_file: Optional[str] = None,
+                 loan_days: int = LOAN_DAYS, holds_file: Optional[str] = None):
+        # persistence backend (JsonStorage or SqliteStorage); defaults to the JSON files.
+        # journal mode: each change appends one record instead of rewriting both files
+        # lazy_members: decode a member from members.json only when it is first looked up
+        self.storage = storage if storage is not None else JsonStorage(
+            books_file, members_file, journal_file, compact_every, lazy_members, loans_file=loans_file,
+            holds_file=holds_file)
+        # store books keyed by ISBN
+        self.books: MutableMapping[str, Book] = self.storage.books
         # store members keyed by member_id
-        self.members: Dict[str, Member] = {}
-        self.books_file = books_file
-        self.members_file = members_file
+        self.members: MutableMapping[str, Member] = self.storage.members
+        # loan ledger (LoanLedger interface): every lend with its due date and return
+        self.loans = self.storage.loans
+        self.loan_days = loan_days
+        # per-ISBN queues of members waiting for a book (HoldQueues interface)
+        self.holds = self.storage.holds
+        # report counters; built on first use (see stats) and then updated by every change
+        self._stats: Optional[LibraryStats] = None
+        # borrowing leaderboards; built on first use like the counters
+        self._popularity: Optional[Popularity] = None
+        # author/title/keyword search indexes from the storage backend; built on first search
+        self._catalog = None
+        # member IDs in registration order, for page_members(); built on first use
+        self._member_order: Optional[List[str]] = None
+        # set by enable_metrics(); None means no instrumentation at all
+        self.metrics: Optional[Metrics] = None
 
     # ---- Book & Member management ----
     def add_book(self, title: str, author: str, isbn: str) -> bool:
         if isbn in self.books:
             return False  # already exists
-        self.books[isbn] = Book(title=title, author=author, isbn=isbn)
+        book = Book(title=title, author=author, isbn=isbn)
+        self.books[isbn] = book
+        self._track("add_book", book=book)
+        self._commit("add_book", book=book)
         return True
 
     def register_member(self, name: str, member_id: str) -> bool:
         if member_id in self.members:
             return False
-        self.members[member_id] = Member(name=name, member_id=member_id)
+        member = Member(name=name, member_id=member_id)
+        self.members[member_id] = member
+        self._track("register_member", member=member)
+        self._commit("register_member", member=member)
         return True
 
+    def add_books(self, books: Iterable[Book]) -> int:
+        """Add many books (bulk import) and persist once, after the last one.
+
+        Books whose ISBN is already in the catalog are skipped; `books` may be
+        a generator and is consumed one book at a time. Returns the number
+        added. The whole catalog is written as one snapshot (one transaction
+        with SQLite) instead of one journal record per book.
+        """
+        added = self._insert_books(books)
+        if added:
+            self.save_data()
+        return added
+
+    def _insert_books(self, books: Iterable[Book]) -> int:
+        added = 0
+        for book in books:
+            if book.isbn in self.books:
+                continue
+            self.books[book.isbn] = book
+            self._track("add_book", book=book)
+            added += 1
+        return added
+
+    def add_copy(self, isbn: str, barcode: Optional[str] = None) -> Optional[str]:
+        """Add a copy of a book already in the catalog and return its barcode.
+
+        Without a barcode the copy is numbered "<isbn>-<n>". Returns None if
+        the book is unknown or the barcode is blank or taken. If members are
+        waiting for the book, the new copy goes straight to the first of them.
+        """
+        book = self.find_book(isbn)
+        if not book or (barcode is not None and not barcode.strip()):
+            return None
+        if barcode is None:
+            taken = set(book.barcodes())
+            n = book.total_copies + 1
+            while f"{isbn}-{n}" in taken:
+                n += 1
+            barcode = f"{isbn}-{n}"
+        if not book.add_copy(barcode):
+            return None
+        self._commit("add_copy", book=book, copy=barcode)
+        holder = self._next_holder(isbn)
+        if holder is not None:
+            self._lend(book, holder)
+        return barcode
+
     def find_book(self, isbn: str) -> Optional[Book]:
         return self.books.get(isbn)
 
     def find_member(self, member_id: str) -> Optional[Member]:
         return self.members.get(member_id)
 
+    # ---- Search ----
+    @property
+    def catalog(self):
+        """Secondary indexes (CatalogIndex interface), rebuilt after each load_data()."""
+        if self._catalog is None:
+            self._catalog = self.storage.catalog_index()
+        return self._catalog
+
+    def find_books_by_author(self, author: str) -> List[Book]:
+        return [self.books[isbn] for isbn in self.catalog.by_author(author)]
+
+    def find_books_by_title_prefix(self, prefix: str, limit: int = SEARCH_LIMIT) -> List[Book]:
+        return [self.books[isbn] for isbn in self.catalog.title_prefix(prefix, limit)]
+
+    def search_books(self, query: str, limit: int = SEARCH_LIMIT) -> List[Book]:
+        """Books whose title or author contains every word in `query`."""
+        return [self.books[isbn] for isbn in self.catalog.search(query, limit)]
+
     # ---- Lend / Return ----
     def lend_book(self, member_id: str, isbn: str) -> str:
         member = self.find_member(member_id)
@@ -51,18 +149,32 @@ class Library:
         if not book:
             return "Book not found."
 
+        # one copy of a title per member
+        if isbn in member.borrowed_books:
+            return f"Member {member.name} already has this book."
+
         if not book.available:
             return "Book is currently not available."
 
         # perform borrow
-        good = book.borrow()
-        if good:
-            member.borrow_book(isbn)
-            self.save_data()  # persist immediately
+        if self._lend(book, member):
             return f"Book '{book.title}' lent to {member.name}."
         else:
             return "Failed to borrow the book (unknown reason)."
 
+    def _lend(self, book: Book, member: Member) -> bool:
+        was_active = bool(member.borrowed_books)
+        if not book.borrow():
+            return False
+        member.borrow_book(book.isbn)
+        now = int(time.time())
+        loan = self.loans.lend(member.member_id, book.isbn, now, now + self.loan_days * DAY)
+        # borrowing the book fulfils the member's hold on it, if any
+        self.holds.cancel(book.isbn, member.member_id)
+        self._track("lend", book=book, member=member, member_was_active=was_active)
+        self._commit("lend", book=book, member=member, loan=loan)  # persist immediately
+        return True
+
     def take_return(self, member_id: str, isbn: str) -> str:
         member = self.find_member(member_id)
         if not member:
@@ -77,56 +189,261 @@ class Library:
             return f"Member {member.name} does not have this book recorded."
 
         returned = book.return_book()
+        # None for loans made before the ledger existed
+        loan = self.loans.close(member_id, isbn, int(time.time()))
+        self._track("return", book=book, member=member, book_was_borrowed=returned)
+        self._commit("return", book=book, member=member, loan=loan)
         if returned:
-            self.save_data()
+            holder = self._next_holder(isbn)
+            if holder is not None and self._lend(book, holder):
+                return (f"Book '{book.title}' returned by {member.name} and lent to {holder.name}, "
+                        f"who had it on hold.")
             return f"Book '{book.title}' successfully returned by {member.name}."
         else:
             # If book was already marked available but member had it listed, still clear member's record already done above.
-            self.save_data()
             return f"Book '{book.title}' return recorded (book was already available)."
 
+    def _next_holder(self, isbn: str) -> Optional[Member]:
+        """Take the first member in the hold queue for `isbn` who can still be found and has no copy yet."""
+        while True:
+            member_id = self.holds.pop_next(isbn)
+            if member_id is None:
+                return None
+            member = self.find_member(member_id)
+            if member is not None and isbn not in member.borrowed_books:
+                return member
+
+    # ---- Holds ----
+    def place_hold(self, member_id: str, isbn: str) -> str:
+        """Queue the member for a lent-out book; returned copies go to the longest-waiting holder."""
+        member = self.find_member(member_id)
+        if not member:
+            return "Member not found."
+        book = self.find_book(isbn)
+        if not book:
+            return "Book not found."
+        if book.available:
+            return "Book is available; borrow it instead."
+        if isbn in member.borrowed_books:
+            return f"Member {member.name} already has this book."
+        if not self.holds.add(isbn, member_id):
+            return f"Member {member.name} already has a hold on this book."
+        self._commit("hold", book=book, member=member)
+        return f"Hold placed for {member.name} on '{book.title}' (position {self.holds.count(isbn)})."
+
+    def cancel_hold(self, member_id: str, isbn: str) -> bool:
+        member = self.find_member(member_id)
+        book = self.find_book(isbn)
+        if not member or not book or not self.holds.cancel(isbn, member_id):
+            return False
+        self._commit("cancel_hold", book=book, member=member)
+        return True
+
+    def hold_queue(self, isbn: str) -> List[str]:
+        """Member IDs waiting for `isbn`, next in line first."""
+        return self.holds.queue(isbn)
+
+    # ---- Loans ----
+    def overdue_loans(self, now: Optional[float] = None) -> List[Loan]:
+        """Loans not yet returned whose due date has passed, earliest due first."""
+        return self.loans.overdue(int(time.time() if now is None else now))
+
+    def loan_history(self, member_id: Optional[str] = None, isbn: Optional[str] = None) -> List[Loan]:
+        """Past and current loans of a member, of a book, or of both, oldest first."""
+        return self.loans.history(member_id, isbn)
+
+    # ---- Batch operations ----
+    def process_batch(self, operations: Iterable[Tuple[str, str, str]], atomic: bool = True) -> List[str]:
+        """Apply (member_id, isbn, action) operations, action being "lend" or "return".
+
+        Returns one message per operation, as lend_book/take_return would, and
+        persists once at the end. With `atomic`, the whole batch is checked first
+        and nothing is applied if any operation would fail.
+        """
+        operations = list(operations)
+        if atomic:
+            errors = self._check_batch(operations)
+            if any(errors):
+                return [error or "Not applied: another operation in the batch failed." for error in errors]
+
+        results = []
+        self.storage.begin_batch()
+        try:
+            for member_id, isbn, action in operations:
+                if action == "lend":
+                    results.append(self.lend_book(member_id, isbn))
+                elif action == "return":
+                    results.append(self.take_return(member_id, isbn))
+                else:
+                    results.append(f"Unknown action '{action}'.")
+        finally:
+            self.storage.end_batch()
+        return results
+
+    def _check_batch(self, operations: List[Tuple[str, str, str]]) -> List[Optional[str]]:
+        """Dry run: the error each operation would get at its point in the batch (None if it succeeds)."""
+        # state as left by the earlier operations of the batch
+        on_shelf: Dict[str, int] = {}
+        held: Dict[Tuple[str, str], bool] = {}
+        # hold queues as consumed by the earlier returns of the batch
+        waiting: Dict[str, Iterator[str]] = {}
+        errors: List[Optional[str]] = []
+        for member_id, isbn, action in operations:
+            if action not in ("lend", "return"):
+                errors.append(f"Unknown action '{action}'.")
+                continue
+            member = self.find_member(member_id)
+            if not member:
+                errors.append("Member not found.")
+                continue
+            book = self.find_book(isbn)
+            if not book:
+                errors.append("Book not found.")
+                continue
+            key = (member_id, isbn)
+            if action == "lend":
+                if held.get(key, isbn in member.borrowed_books):
+                    errors.append(f"Member {member.name} already has this book.")
+                    continue
+                shelf = on_shelf.get(isbn, book.on_shelf)
+                if not shelf:
+                    errors.append("Book is currently not available.")
+                    continue
+                on_shelf[isbn] = shelf - 1
+                held[key] = True
+            else:
+                if not held.get(key, isbn in member.borrowed_books):
+                    errors.append(f"Member {member.name} does not have this book recorded.")
+                    continue
+                held[key] = False
+                # the returned copy goes to the next holder, as _next_holder() would pick
+                holder = None
+                for waiting_id in waiting.setdefault(isbn, iter(self.holds.queue(isbn))):
+                    waiter = self.find_member(waiting_id)
+                    if waiter is not None and not held.get((waiting_id, isbn), isbn in waiter.borrowed_books):
+                        holder = waiting_id
+                        break
+                if holder is not None:
+                    held[(holder, isbn)] = True
+                else:
+                    on_shelf[isbn] = on_shelf.get(isbn, book.on_shelf) + 1
+            errors.append(None)
+        return errors
+
     # ---- Persistence ----
+    def _track(self, op: str, book: Optional[Book] = None, member: Optional[Member] = None,
+               member_was_active: bool = False, book_was_borrowed: bool = False) -> None:
+        """Apply a change to whichever derived structures (counters, leaderboards, search) are built."""
+        if self._stats is not None:
+            if op == "add_book":
+                self._stats.add_book(book)
+            elif op == "register_member":
+                self._stats.register_member()
+            elif op == "lend":
+                self._stats.lend(book, member_was_active)
+            else:
+                self._stats.take_return(book_was_borrowed, bool(member.borrowed_books))
+        if op == "lend" and self._popularity is not None:
+            self._popularity.lend(book)
+        if op == "add_book" and self._catalog is not None:
+            self._catalog.add(book)
+        if op == "register_member" and self._member_order is not None:
+            self._member_order.append(member.member_id)
+
+    def _commit(self, op: str, book: Optional[Book] = None, member: Optional[Member] = None,
+                loan: Optional[Loan] = None, copy: Optional[str] = None) -> None:
+        """Persist a single change through the storage backend."""
+        self.storage.commit(op, book=book, member=member, loan=loan, copy=copy)
+
     def save_data(self) -> None:
-        # books
-        try:
-            with open(self.books_file, "w", encoding="utf-8") as f:
-                books_list = [b.to_dict() for b in self.books.values()]
-                json.dump(books_list, f, indent=2)
-        except Exception as e:
-            print(f"Error saving books: {e}")
+        self.storage.save()
 
-        # members
-        try:
-            with open(self.members_file, "w", encoding="utf-8") as f:
-                members_list = [m.to_dict() for m in self.members.values()]
-                json.dump(members_list, f, indent=2)
-        except Exception as e:
-            print(f"Error saving members: {e}")
-
-    def load_data(self) -> None:
-        # load books
-        if os.path.exists(self.books_file):
-            try:
-                with open(self.books_file, "r", encoding="utf-8") as f:
-                    books_list = json.load(f)
-                for bd in books_list:
-                    b = Book.from_dict(bd)
-                    self.books[b.isbn] = b
-            except Exception as e:
-                print(f"Error loading books data: {e}")
-
-        # load members
-        if os.path.exists(self.members_file):
-            try:
-                with open(self.members_file, "r", encoding="utf-8") as f:
-                    members_list = json.load(f)
-                for md in members_list:
-                    m = Member.from_dict(md)
-                    self.members[m.member_id] = m
-            except Exception as e:
-                print(f"Error loading members data: {e}")
+    def load_data(self, progress: Optional[ProgressCallback] = None) -> None:
+        """Load persisted data, reporting progress(kind, count) while streaming.
+
+        Raises SnapshotError when no JSON save, not even the previous one, is complete.
+        """
+        self.storage.load(progress=progress)
+        self._stats = None
+        self._popularity = None
+        self._catalog = None
+        self._member_order = None
+
+    def close(self) -> None:
+        if self.metrics is not None:
+            self.metrics.close()
+        self.storage.close()
+
+    # ---- Instrumentation ----
+    def enable_metrics(self, metrics: Optional[Metrics] = None, dump_file: Optional[str] = None,
+                       dump_interval: float = DUMP_INTERVAL) -> Metrics:
+        """Count and time every call of the INSTRUMENTED methods; returns the Metrics.
+
+        Timing wrappers are installed on this instance only, so a Library
+        without metrics runs the plain methods. With `dump_file`, the metrics
+        are also written there periodically (see Metrics.start_dump()).
+        """
+        self.disable_metrics()
+        metrics = metrics if metrics is not None else Metrics()
+        for op in INSTRUMENTED:
+            setattr(self, op, metrics.wrap(op, getattr(self, op)))
+        # the storage reports every save, including the journal compactions it starts itself
+        if hasattr(self.storage, "on_save"):
+            self.storage.on_save = metrics.record_save
+
+        journal = getattr(self.storage, "journal", None)
+        if journal is not None:
+            metrics.gauges["journal_bytes_written"] = lambda: journal.bytes_written
+        if hasattr(self.storage, "snapshot_bytes"):
+            metrics.gauges["snapshot_bytes_written"] = lambda: self.storage.snapshot_bytes
+        if dump_file:
+            metrics.start_dump(dump_file, dump_interval)
+        self.metrics = metrics
+        return metrics
+
+    def disable_metrics(self) -> None:
+        """Remove the wrappers installed by enable_metrics() (the Metrics object keeps its data)."""
+        if self.metrics is None:
+            return
+        for op in INSTRUMENTED:
+            self.__dict__.pop(op, None)
+        if hasattr(self.storage, "on_save"):
+            self.storage.on_save = None
+        self.metrics.close()
+        self.metrics = None
 
     # ---- Analytics ----
+    @property
+    def stats(self) -> LibraryStats:
+        """Report counters: one full scan on first use, then maintained by each change."""
+        if self._stats is None:
+            self._stats = LibraryStats.from_scan(self.books.values(), self.members.values())
+        return self._stats
+
+    def verify_stats(self) -> List[str]:
+        """Compare the maintained counters with a fresh full scan; returns the differences."""
+        return self.stats.differences(LibraryStats.from_scan(self.books.values(), self.members.values()))
+
+    def top_borrowed(self, k: int = 10, author: Optional[str] = None,
+                     window: Optional[str] = None) -> List[Tuple[Book, int]]:
+        """The k most borrowed books with their borrow counts, highest first.
+
+        `author` ranks only that author's books; `window` ("day", "week", "month")
+        ranks by lends within that rolling window instead of all-time borrow_count.
+        Books never borrowed are not ranked.
+        """
+        if self._popularity is None:
+            self._popularity = self._scan_popularity()
+        ranked = self._popularity.top(k, author=author, window=window)
+        return [(self.find_book(isbn), count) for isbn, count in ranked]
+
+    def _scan_popularity(self) -> Popularity:
+        """Leaderboards from the books' borrow counts and, for the windows, the ledger's recent lends."""
+        # lends older than the longest window count in no window
+        since = int(time.time() - max(WINDOWS.values()))
+        return Popularity.from_scan(self.books.values(), lends=self.loans.lends_since(since))
+
+    # full-scan versions, kept as the reference for verify_stats()
     def most_borrowed_book(self) -> Optional[Book]:
         if not self.books:
             return None
@@ -137,23 +454,100 @@ class Library:
         return sum(1 for m in self.members.values() if m.borrowed_books)
 
     def number_of_books_currently_borrowed(self) -> int:
-        return sum(1 for b in self.books.values() if not b.available)
+        return sum(b.on_loan for b in self.books.values())
 
     def library_report(self) -> str:
-        most = self.most_borrowed_book()
+        stats = self.stats
+        most = self.find_book(stats.most_borrowed_isbn) if stats.most_borrowed_isbn is not None else None
         most_str = f"'{most.title}' (ISBN: {most.isbn}) borrowed {most.borrow_count} times." if most else "No books yet."
         report = (
-            f"Total books: {len(self.books)}\n"
-            f"Total members: {len(self.members)}\n"
-            f"Active members (with at least one borrowed book): {self.total_active_members()}\n"
-            f"Books currently borrowed: {self.number_of_books_currently_borrowed()}\n"
+            f"Total books: {stats.total_books}\n"
+            f"Total members: {stats.total_members}\n"
+            f"Active members (with at least one borrowed book): {stats.active_members}\n"
+            f"Books currently borrowed: {stats.borrowed_books}\n"
             f"Most borrowed book: {most_str}"
         )
         return report
 
     # convenience: list books and members
-    def list_all_books(self) -> List[str]:
-        return [str(b) for b in self.books.values()]
+    def list_all_books(self, available_only: bool = False, author: Optional[str] = None,
+                       sort: Optional[str] = None) -> List[str]:
+        return [str(b) for b in self.iter_books(available_only, author, sort)]
+
+    def list_all_members(self, active_only: bool = False) -> List[str]:
+        return [str(m) for m in self.iter_members(active_only)]
+
+    # ---- Listing ----
+    def iter_books(self, available_only: bool = False, author: Optional[str] = None,
+                   sort: Optional[str] = None) -> Iterator[Book]:
+        """Books one at a time, optionally only available ones and/or one author's.
+
+        `sort` is None (the order books were added) or "title". Books added
+        while the generator is running may be missed or shift the title
+        order; use page_books() to list across changes.
+        """
+        for _, isbn in self._book_listing(author, sort):
+            book = self.books.get(isbn)
+            if book is not None and (book.available or not available_only):
+                yield book
+
+    def iter_members(self, active_only: bool = False) -> Iterator[Member]:
+        """Members one at a time (in lazy mode, streamed from members.json)."""
+        for member in self.members.values():
+            if member.borrowed_books or not active_only:
+                yield member
+
+    def page_books(self, cursor: Optional[str] = None, limit: int = PAGE_SIZE, available_only: bool = False,
+                   author: Optional[str] = None, sort: Optional[str] = None) -> Tuple[List[Book], Optional[str]]:
+        """One page of iter_books() and the cursor for the next page (None after the last).
+
+        Pass the returned cursor back with the same filters to continue. The
+        cursor is the catalog position of the last book looked at, and the
+        next page starts right after it (a binary search in the catalog
+        index, or an index range scan with SQLite), so a page costs the same
+        wherever it is and books added between calls do not shift the rest.
+        """
+        return _page(lambda after: self._book_listing(author, sort, after), cursor, limit, self.books.get,
+                     lambda book: book.available or not available_only)
+
+    def page_members(self, cursor: Optional[str] = None, limit: int = PAGE_SIZE,
+                     active_only: bool = False) -> Tuple[List[Member], Optional[str]]:
+        """One page of iter_members() and the cursor for the next page (None after the last).
+
+        The cursor is the registration number of the last member looked at.
+        The first call lists the member IDs once; later members are added to
+        the end of that list, so pages neither shift nor repeat.
+        """
+        if self._member_order is None:
+            self._member_order = list(self.members)
+        order = self._member_order
+
+        def listing(after: Optional[int]) -> Iterator[Tuple[int, str]]:
+            for position in range(0 if after is None else after + 1, len(order)):
+                yield position, order[position]
+        return _page(listing, cursor, limit, self.members.get,
+                     lambda member: bool(member.borrowed_books) or not active_only)
+
+    def _book_listing(self, author: Optional[str], sort: Optional[str],
+                      after: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """(catalog position, ISBN) in listing order, narrowed to `author` through the author index."""
+        if sort not in (None, "title"):
+            raise ValueError(f"unknown sort {sort!r}; expected None or 'title'")
+        return self.catalog.listing(author, sort, after)
+
 
-    def list_all_members(self) -> List[str]:
-        return [str(m) for m in self.members.values()]
+def _page(listing, cursor: Optional[str], limit: int, lookup, keep) -> Tuple[List, Optional[str]]:
+    # listing(after) yields (position, key) starting just after position `after`;
+    # the cursor is the position of the last key looked at
+    try:
+        after = int(cursor) if cursor else None
+    except ValueError:
+        raise ValueError(f"invalid cursor {cursor!r}") from None
+    page = []
+    for position, key in listing(after):
+        item = lookup(key)
+        if item is not None and keep(item):
+            page.append(item)
+            if len(page) == limit:
+                return page, str(position)
+    return page, None
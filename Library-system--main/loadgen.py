@@ -0,0 +1,110 @@
+"""
+Name: Replace with your name
+Date: 2025-11-19
+Assignment: Library System - loadgen.py
+
+Load generator for server.py: many connections, each keeping several
+pipelined lend/return requests in flight. Reports requests/sec and p50/p99
+latency. Without --port it starts its own server on a temporary directory.
+Run: python loadgen.py [--connections 32] [--depth 8] [--requests 20000]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from typing import List
+from server import LibraryServer, open_library, HOST
+
+
+async def call_all(host: str, port: int, requests: List[dict]) -> None:
+    """Send requests over one connection, pipelined, and wait for every response."""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b"".join(json.dumps(r).encode() + b"\n" for r in requests))
+    await writer.drain()
+    for _ in requests:
+        await reader.readline()
+    writer.close()
+    await writer.wait_closed()
+
+
+async def client(host: str, port: int, rng: random.Random, count: int, depth: int,
+                 books: int, members: int, latencies: List[float]) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    sent = {}
+    in_flight = asyncio.Semaphore(depth)
+
+    async def receive():
+        for _ in range(count):
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - sent.pop(response["id"]))
+            in_flight.release()
+
+    receiver = asyncio.create_task(receive())
+    for i in range(count):
+        await in_flight.acquire()
+        op = "lend_book" if rng.random() < 0.5 else "take_return"
+        args = {"member_id": f"M{rng.randrange(members)}", "isbn": f"isbn-{rng.randrange(books)}"}
+        sent[i] = time.perf_counter()
+        writer.write(json.dumps({"id": i, "op": op, "args": args}).encode() + b"\n")
+        await writer.drain()
+    await receiver
+    writer.close()
+    await writer.wait_closed()
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def run(args) -> None:
+    server = lib = tmp = None
+    host, port = args.host, args.port
+    if port is None:
+        tmp = tempfile.TemporaryDirectory()
+        lib = open_library(tmp.name)
+        server = LibraryServer(lib)
+        port = await server.start(host, 0)
+
+    # catalog and members for the run
+    setup = [{"id": i, "op": "add_book", "args": {"title": f"Title {i}", "author": f"Author {i % 100}",
+                                                   "isbn": f"isbn-{i}"}} for i in range(args.books)]
+    setup += [{"id": i, "op": "register_member", "args": {"name": f"Member {i}", "member_id": f"M{i}"}}
+              for i in range(args.members)]
+    await call_all(host, port, setup)
+
+    latencies: List[float] = []
+    per_client = args.requests // args.connections
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, random.Random(c), per_client, args.depth, args.books,
+                                  args.members, latencies) for c in range(args.connections)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{len(latencies)} requests over {args.connections} connections, pipeline depth {args.depth}")
+    print(f"throughput: {len(latencies) / elapsed:.0f} req/s")
+    print(f"latency:    p50 {percentile(latencies, 0.50) * 1000:.2f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.2f} ms, max {latencies[-1] * 1000:.2f} ms")
+
+    if server is not None:
+        await server.stop()
+        lib.close()
+        tmp.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the library server.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=None, help="server to test (default: start one)")
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--depth", type=int, default=8, help="pipelined requests in flight per connection")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--books", type=int, default=1000)
+    parser.add_argument("--members", type=int, default=1000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Name: Replace with your name
+Date: 2025-11-19
+Assignment: Library System - loans.py
+"""
+
+import heapq
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# days a book may be kept before the loan is overdue
+LOAN_DAYS = 14
+DAY = 24 * 3600
+# returned_at of a loan that is still open
+_OPEN = -1
+
+
+class Loan(NamedTuple):
+    member_id: str
+    isbn: str
+    lent_at: int
+    due_at: int
+    returned_at: Optional[int]  # None while the book is still out
+
+    def to_row(self) -> List:
+        return [self.member_id, self.isbn, self.lent_at, self.due_at, self.returned_at]
+
+
+class LoanLedger:
+    """Every loan ever made: (member, isbn, lent_at, due_at, returned_at), times in epoch seconds.
+
+    Loans are stored column-wise in typed arrays, with member IDs and ISBNs
+    replaced by small integers, so a loan costs a few dozen bytes. Open loans
+    are kept in a min-heap on due date: overdue() only visits the part of the
+    heap that is already due. Returned loans leave the heap lazily, and the
+    heap is rebuilt once they outnumber the open ones.
+    """
+
+    def __init__(self):
+        self._member_ids: List[str] = []
+        self._member_index: Dict[str, int] = {}
+        self._isbns: List[str] = []
+        self._isbn_index: Dict[str, int] = {}
+        # one entry per loan, indexed by loan id
+        self._member = array("I")
+        self._isbn = array("I")
+        self._lent = array("q")
+        self._due = array("q")
+        self._returned = array("q")
+        # (member, isbn) key -> id of the open loan
+        self._open: Dict[int, int] = {}
+        # loan ids per member and per book, for history()
+        self._by_member: Dict[int, array] = {}
+        self._by_isbn: Dict[int, array] = {}
+        # (due_at, loan id) of open loans, plus returned ones not yet dropped
+        self._heap: List[Tuple[int, int]] = []
+        self._stale = 0
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def lend(self, member_id: str, isbn: str, lent_at: int, due_at: int) -> Loan:
+        self._append(member_id, isbn, lent_at, due_at, None)
+        return Loan(member_id, isbn, lent_at, due_at, None)
+
+    def close(self, member_id: str, isbn: str, returned_at: int) -> Optional[Loan]:
+        """Mark the open loan of `isbn` to `member_id` returned; None if there is none."""
+        member, book = self._member_index.get(member_id), self._isbn_index.get(isbn)
+        if member is None or book is None:
+            return None
+        loan_id = self._open.pop(_key(member, book), None)
+        if loan_id is None:
+            return None
+        self._returned[loan_id] = returned_at
+        self._stale += 1
+        if self._stale > 1024 and self._stale * 2 > len(self._heap):
+            self._heap = [(self._due[i], i) for i in self._open.values()]
+            heapq.heapify(self._heap)
+            self._stale = 0
+        return self._loan(loan_id)
+
+    def open_loan(self, member_id: str, isbn: str) -> Optional[Loan]:
+        member, book = self._member_index.get(member_id), self._isbn_index.get(isbn)
+        if member is None or book is None:
+            return None
+        loan_id = self._open.get(_key(member, book))
+        return self._loan(loan_id) if loan_id is not None else None
+
+    def overdue(self, now: int) -> List[Loan]:
+        """Open loans with due_at before `now`, earliest due first."""
+        heap = self._heap
+        found = []
+        # walk the heap from the root; below an entry that is not due yet, nothing is
+        stack = [0] if heap else []
+        while stack:
+            i = stack.pop()
+            due, loan_id = heap[i]
+            if due >= now:
+                continue
+            if self._returned[loan_id] == _OPEN:
+                found.append((due, loan_id))
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    stack.append(child)
+        found.sort()
+        return [self._loan(loan_id) for _, loan_id in found]
+
+    def history(self, member_id: Optional[str] = None, isbn: Optional[str] = None) -> List[Loan]:
+        """Loans of one member, of one book, or of that member and book, oldest first."""
+        if member_id is None and isbn is None:
+            raise ValueError("give a member_id, an isbn or both")
+        postings = []
+        if member_id is not None:
+            postings.append(self._by_member.get(self._member_index.get(member_id), ()))
+        if isbn is not None:
+            postings.append(self._by_isbn.get(self._isbn_index.get(isbn), ()))
+        ids = postings[0] if len(postings) == 1 else sorted(set(postings[0]).intersection(postings[1]))
+        return [self._loan(loan_id) for loan_id in ids]
+
+    def lends_since(self, since: int) -> Iterator[Tuple[str, int]]:
+        """(isbn, lent_at) of the loans made at or after `since`, in lend order."""
+        # loans are appended as they are made, so lent_at only grows
+        for loan_id in range(bisect_left(self._lent, since), len(self._lent)):
+            yield self._isbns[self._isbn[loan_id]], self._lent[loan_id]
+
+    def load(self, rows: Iterable[List]) -> None:
+        """Append loans from to_row() lists (snapshot order)."""
+        for member_id, isbn, lent_at, due_at, returned_at in rows:
+            self._append(member_id, isbn, lent_at, due_at, returned_at)
+
+    def rows(self) -> Iterator[List]:
+        for loan_id in range(len(self._lent)):
+            yield self._loan(loan_id).to_row()
+
+    def __len__(self) -> int:
+        return len(self._lent)
+
+    def _append(self, member_id: str, isbn: str, lent_at: int, due_at: int, returned_at: Optional[int]) -> None:
+        member = self._intern(member_id, self._member_ids, self._member_index)
+        book = self._intern(isbn, self._isbns, self._isbn_index)
+        loan_id = len(self._lent)
+        self._member.append(member)
+        self._isbn.append(book)
+        self._lent.append(lent_at)
+        self._due.append(due_at)
+        self._returned.append(_OPEN if returned_at is None else returned_at)
+        self._by_member.setdefault(member, array("I")).append(loan_id)
+        self._by_isbn.setdefault(book, array("I")).append(loan_id)
+        if returned_at is None:
+            self._open[_key(member, book)] = loan_id
+            heapq.heappush(self._heap, (due_at, loan_id))
+
+    def _loan(self, loan_id: int) -> Loan:
+        returned = self._returned[loan_id]
+        return Loan(self._member_ids[self._member[loan_id]], self._isbns[self._isbn[loan_id]],
+                    self._lent[loan_id], self._due[loan_id], None if returned == _OPEN else returned)
+
+    @staticmethod
+    def _intern(value: str, values: List[str], index: Dict[str, int]) -> int:
+        number = index.get(value)
+        if number is None:
+            number = index[value] = len(values)
+            values.append(value)
+        return number
+
+
+def _key(member: int, book: int) -> int:
+    return member << 32 | book
@@ -4,7 +4,9 @@ Date: 2025-11-19
 Assignment: Library System - main.py
 """
 
-from library import Library
+import os
+from library import Library, JOURNAL_FILE, PAGE_SIZE
+from snapshot import SnapshotError
 
 def print_welcome():
     print("******************************************")
@@ -12,9 +14,35 @@ def print_welcome():
     print("      Programming for Problem Solving     ")
     print("******************************************\n")
 
+def print_pages(fetch_page):
+    """Print a listing one page at a time; fetch_page(cursor) returns (items, next_cursor)."""
+    cursor = None
+    shown = 0
+    while True:
+        items, cursor = fetch_page(cursor)
+        for item in items:
+            print(" -", item)
+        shown += len(items)
+        if cursor is None:
+            break
+        if input(f"-- {shown} shown. Press Enter for more, or q to stop: ").strip().lower() == "q":
+            break
+    if not shown:
+        print(" (none)")
+
 def main_menu():
-    lib = Library()
-    lib.load_data()
+    # journal mode: each transaction appends one record; snapshots are rewritten on compaction/exit
+    # members are decoded on first use, so startup does not wait on members.json
+    lib = Library(journal_file=JOURNAL_FILE, lazy_members=True)
+    try:
+        lib.load_data()
+    except SnapshotError as e:
+        print(f"Error: {e}")
+        print("Restore books.json, members.json, loans.json and holds.json from the same backup before starting again.")
+        return
+    # LIBRARY_METRICS=<file>: time every operation and dump the metrics to that file
+    if os.environ.get("LIBRARY_METRICS"):
+        lib.enable_metrics(dump_file=os.environ["LIBRARY_METRICS"])
     print_welcome()
 
     while True:
@@ -35,17 +63,18 @@ def main_menu():
             isbn = input("ISBN: ").strip()
             ok = lib.add_book(title=title, author=author, isbn=isbn)
             if ok:
-                lib.save_data()
                 print("Book added successfully.")
             else:
                 print("A book with that ISBN already exists.")
+                if input("Add another copy of it? (y/N): ").strip().lower() == "y":
+                    barcode = lib.add_copy(isbn)
+                    print(f"Copy {barcode} added." if barcode is not None else "Could not add the copy.")
 
         elif choice == "2":
             name = input("Member Name: ").strip()
             member_id = input("Member ID: ").strip()
             ok = lib.register_member(name=name, member_id=member_id)
             if ok:
-                lib.save_data()
                 print("Member registered successfully.")
             else:
                 print("Member ID already exists.")
@@ -55,6 +84,9 @@ def main_menu():
             isbn = input("ISBN of book to borrow: ").strip()
             msg = lib.lend_book(member_id=member_id, isbn=isbn)
             print(msg)
+            if msg == "Book is currently not available.":
+                if input("Place a hold? (y/N): ").strip().lower() == "y":
+                    print(lib.place_hold(member_id=member_id, isbn=isbn))
 
         elif choice == "4":
             member_id = input("Member ID: ").strip()
@@ -68,18 +100,20 @@ def main_menu():
             print(lib.library_report())
 
         elif choice == "6":
+            available_only = input("Only available books? (y/N): ").strip().lower() == "y"
+            author = input("Author (blank for all): ").strip() or None
             print("\nBooks:")
-            for s in lib.list_all_books():
-                print(" -", s)
+            print_pages(lambda cursor: lib.page_books(cursor, PAGE_SIZE, available_only=available_only,
+                                                      author=author, sort="title"))
 
         elif choice == "7":
             print("\nMembers:")
-            for s in lib.list_all_members():
-                print(" -", s)
+            print_pages(lambda cursor: lib.page_members(cursor, PAGE_SIZE))
 
         elif choice == "8":
             print("Saving data and exiting...")
             lib.save_data()
+            lib.close()
             break
 
         else:
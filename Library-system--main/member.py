@@ -4,25 +4,50 @@ Date: 2025-11-19
 Assignment: Library System - member.py
 """
 
-from typing import List, Dict
+from typing import Dict, Iterable, List, Union
+
+# above this many loans, borrowed_books switches from a list to an insertion-ordered set
+LOAN_SET_THRESHOLD = 16
 
 class Member:
-    def __init__(self, name: str, member_id: str, borrowed_books: List[str] = None):
+    # no per-instance __dict__: large member bases hold millions of these
+    __slots__ = ("name", "member_id", "borrowed_books")
+
+    def __init__(self, name: str, member_id: str, borrowed_books: Iterable[str] = None):
         self.name = name
         self.member_id = member_id
-        self.borrowed_books = borrowed_books if borrowed_books is not None else []
+        # ISBNs in borrowing order. A short list for the usual handful of loans; members
+        # holding many (departments, partner libraries) get a dict used as an ordered set,
+        # so borrow/return stay O(1).
+        self.borrowed_books: Union[List[str], Dict[str, None]] = []
+        if borrowed_books is not None:
+            if isinstance(borrowed_books, list) and len(borrowed_books) <= LOAN_SET_THRESHOLD:
+                self.borrowed_books = borrowed_books
+            else:
+                self.borrowed_books = dict.fromkeys(borrowed_books)
 
     def borrow_book(self, isbn: str) -> None:
-        """Add ISBN to the member's borrowed list (no validation here)."""
-        if isbn not in self.borrowed_books:
-            self.borrowed_books.append(isbn)
+        """Add ISBN to the member's borrowed books (no validation here)."""
+        loans = self.borrowed_books
+        if isbn in loans:
+            return
+        if type(loans) is dict:
+            loans[isbn] = None
+            return
+        loans.append(isbn)
+        if len(loans) > LOAN_SET_THRESHOLD:
+            self.borrowed_books = dict.fromkeys(loans)
 
     def return_book(self, isbn: str) -> bool:
         """Remove ISBN from borrowed_books. Returns True if removed, False if not found."""
-        if isbn in self.borrowed_books:
-            self.borrowed_books.remove(isbn)
-            return True
-        return False
+        loans = self.borrowed_books
+        if isbn not in loans:
+            return False
+        if type(loans) is dict:
+            del loans[isbn]
+        else:
+            loans.remove(isbn)
+        return True
 
     def list_books(self) -> List[str]:
         """Return the list of currently borrowed ISBNs."""
@@ -32,7 +57,7 @@ class Member:
         return {
             "name": self.name,
             "member_id": self.member_id,
-            "borrowed_books": self.borrowed_books
+            "borrowed_books": list(self.borrowed_books)
         }
 
     @classmethod
@@ -0,0 +1,244 @@
+"""
+Name: Replace with your name
+Date: 2025-11-19
+Assignment: Library System - metrics.py
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Library methods that Library.enable_metrics() times
+INSTRUMENTED = ("add_book", "add_books", "add_copy", "register_member", "lend_book", "take_return", "process_batch",
+                "save_data", "load_data", "library_report", "top_borrowed", "search_books",
+                "find_books_by_author", "find_books_by_title_prefix", "list_all_books", "list_all_members",
+                "page_books", "page_members", "overdue_loans", "loan_history", "place_hold", "cancel_hold")
+# seconds between writes of the dump file
+DUMP_INTERVAL = 60.0
+
+# each power of two is split into this many buckets (2 bits), so a bucket is at most 25% wide
+_SUB_BITS = 2
+_SUB = 1 << _SUB_BITS
+
+
+def _bucket(value: int) -> int:
+    if value < _SUB:
+        return max(value, 0)
+    shift = value.bit_length() - _SUB_BITS - 1
+    return (shift + 1) * _SUB + ((value >> shift) & (_SUB - 1))
+
+
+def _bucket_bounds(index: int):
+    if index < _SUB:
+        return index, index + 1
+    shift = index // _SUB - 1
+    low = (_SUB + index % _SUB) << shift
+    return low, low + (1 << shift)
+
+
+class Histogram:
+    """Counts of non-negative integer values (nanoseconds, bytes) in log-linear buckets.
+
+    Recording is a few integer operations, memory is fixed, and percentiles
+    are accurate to the bucket width (under 25% of the value).
+    """
+
+    __slots__ = ("count", "total", "min", "max", "_buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max = 0
+        self._buckets: List[int] = [0] * (64 * _SUB)
+
+    def add(self, value: int) -> None:
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self._buckets[_bucket(value)] += 1
+
+    def percentile(self, fraction: float) -> int:
+        """Approximate value below which `fraction` of the recorded values fall."""
+        if not self.count:
+            return 0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self._buckets):
+            seen += count
+            if count and seen >= rank:
+                low, high = _bucket_bounds(index)
+                return min(max((low + high) // 2, self.min), self.max)
+        return self.max
+
+    def summary(self, scale: float = 1.0) -> Dict:
+        """count, mean and percentiles, each value divided by `scale`."""
+        def scaled(value):
+            return round(value / scale, 3)
+        return {
+            "count": self.count,
+            "total": scaled(self.total),
+            "mean": scaled(self.total / self.count) if self.count else 0,
+            "min": scaled(self.min or 0),
+            "p50": scaled(self.percentile(0.50)),
+            "p90": scaled(self.percentile(0.90)),
+            "p99": scaled(self.percentile(0.99)),
+            "max": scaled(self.max),
+        }
+
+
+class Metrics:
+    """Counters and histograms for an instrumented Library (see Library.enable_metrics()).
+
+    Each instrumented operation gets a call counter, an error counter and a
+    latency histogram; save_data() also records the bytes it wrote.
+    Optionally, the operations named in `profile` run under one shared
+    cProfile profiler (see profile_report()), and with `trace_memory` the
+    peak Python allocation of every call is recorded as well (tracemalloc;
+    this slows everything down noticeably). A profiled call made from inside
+    another one (process_batch -> lend_book) is timed, but its profile and
+    memory are counted in the outer call's.
+
+    Updates take no lock, so with many threads (ConcurrentLibrary) counts
+    can occasionally miss a call.
+    """
+
+    def __init__(self, profile: Iterable[str] = (), trace_memory: bool = False):
+        self.counters: Dict[str, int] = {}
+        self.latency: Dict[str, Histogram] = {}
+        self.save_bytes = Histogram()
+        self.memory: Dict[str, Histogram] = {}
+        # name -> function, read on every snapshot (e.g. storage byte counts)
+        self.gauges: Dict[str, Callable[[], object]] = {}
+        self.profile_ops = frozenset(profile)
+        self.profiler: Optional[cProfile.Profile] = cProfile.Profile() if self.profile_ops else None
+        self.trace_memory = trace_memory
+        self._depth = threading.local()
+        self.started = time.time()
+        self._dump_stop: Optional[threading.Event] = None
+        self._dump_thread: Optional[threading.Thread] = None
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def wrap(self, op: str, call: Callable) -> Callable:
+        """`call` with its calls counted and timed under the name `op`."""
+        histogram = self.latency.setdefault(op, Histogram())
+        counters = self.counters
+        counters.setdefault(op, 0)
+        errors = op + ".errors"
+        clock = time.perf_counter_ns
+
+        if op not in self.profile_ops and not self.trace_memory:
+            def timed(*args, **kwargs):
+                start = clock()
+                try:
+                    return call(*args, **kwargs)
+                except Exception:
+                    counters[errors] = counters.get(errors, 0) + 1
+                    raise
+                finally:
+                    histogram.add(clock() - start)
+                    counters[op] += 1
+            return timed
+
+        profiler = self.profiler if op in self.profile_ops else None
+        memory = self.memory.setdefault(op, Histogram()) if self.trace_memory else None
+        if memory is not None and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        depth = self._depth
+
+        def profiled(*args, **kwargs):
+            outer = not getattr(depth, "value", 0)
+            depth.value = getattr(depth, "value", 0) + 1
+            if outer and memory is not None:
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+            if outer and profiler is not None:
+                profiler.enable()
+            start = clock()
+            try:
+                return call(*args, **kwargs)
+            except Exception:
+                counters[errors] = counters.get(errors, 0) + 1
+                raise
+            finally:
+                histogram.add(clock() - start)
+                depth.value -= 1
+                if outer and profiler is not None:
+                    profiler.disable()
+                if outer and memory is not None:
+                    memory.add(max(tracemalloc.get_traced_memory()[1] - base, 0))
+                counters[op] += 1
+        return profiled
+
+    def record_save(self, written: Optional[int]) -> None:
+        if written is not None:
+            self.save_bytes.add(written)
+            self.count("bytes_written", written)
+
+    def snapshot(self) -> Dict:
+        """All metrics as plain data: latencies in microseconds, sizes in bytes."""
+        data = {
+            "uptime_seconds": round(time.time() - self.started, 3),
+            "counters": dict(self.counters),
+            "latency_us": {op: h.summary(1000) for op, h in self.latency.items() if h.count},
+            "save_bytes": self.save_bytes.summary(),
+            "gauges": {name: read() for name, read in self.gauges.items()},
+        }
+        if self.memory:
+            data["peak_alloc_bytes"] = {op: h.summary() for op, h in self.memory.items() if h.count}
+        return data
+
+    def profile_report(self, limit: int = 30, sort: str = "cumulative") -> str:
+        """pstats listing of everything profiled so far ("" if profiling is off)."""
+        if self.profiler is None:
+            return ""
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def dump(self, path: str) -> None:
+        """Write snapshot() to `path` as JSON, replacing the file in one step."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def start_dump(self, path: str, interval: float = DUMP_INTERVAL) -> None:
+        """Dump to `path` every `interval` seconds from a background thread, until stop_dump()."""
+        self.stop_dump()
+        stop = self._dump_stop = threading.Event()
+
+        def loop():
+            while not stop.wait(interval):
+                try:
+                    self.dump(path)
+                except OSError as e:
+                    print(f"Error writing metrics to {path}: {e}")
+            self.dump(path)
+
+        self._dump_thread = threading.Thread(target=loop, name="metrics-dump", daemon=True)
+        self._dump_thread.start()
+
+    def stop_dump(self) -> None:
+        """Stop the periodic dump (writing the file one last time)."""
+        if self._dump_stop is not None:
+            self._dump_stop.set()
+            self._dump_thread.join()
+            self._dump_stop = self._dump_thread = None
+
+    def close(self) -> None:
+        self.stop_dump()
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
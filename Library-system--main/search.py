@@ -0,0 +1,153 @@
+"""
+Name: Replace with your name
+Date: 2025-11-19
+Assignment: Library System - search.py
+"""
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from book import Book
+
+# results returned by a title-prefix or keyword search unless told otherwise
+SEARCH_LIMIT = 50
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Casefolded words of `text`, as used for keyword search."""
+    return _TOKEN.findall(text.casefold())
+
+
+class CatalogIndex:
+    """In-memory secondary indexes over the books: author, title prefix and keywords.
+
+    Every book gets a small integer id in the order it was added. Author and
+    keyword postings are arrays of those ids, so they are compact and already
+    sorted, and keyword queries intersect them by binary search. Titles are
+    kept in a sorted list of casefolded keys for prefix lookups, ordered by
+    (title, id) so listings can resume after any book (see listing()).
+    """
+
+    def __init__(self):
+        # id -> ISBN
+        self._isbns: List[str] = []
+        # id -> casefolded title
+        self._title_of: List[str] = []
+        self._by_author: Dict[str, array] = {}
+        self._tokens: Dict[str, array] = {}
+        # casefolded titles, sorted, with the matching ids alongside
+        self._title_keys: List[str] = []
+        self._title_ids = array("I")
+        # the same per author, built when an author's books are first listed by title
+        self._author_titles: Dict[str, Tuple[List[str], array]] = {}
+
+    @classmethod
+    def from_books(cls, books: Iterable[Book]) -> "CatalogIndex":
+        index = cls()
+        for book in books:
+            index._add_postings(book)
+        index._title_keys, index._title_ids = index._title_order(range(len(index._isbns)))
+        return index
+
+    def add(self, book: Book) -> None:
+        book_id = self._add_postings(book)
+        key = self._title_of[book_id]
+        # the new id is the largest, so it goes after any equal title
+        position = bisect_right(self._title_keys, key)
+        self._title_keys.insert(position, key)
+        self._title_ids.insert(position, book_id)
+        titles = self._author_titles.get(book.author.casefold())
+        if titles is not None:
+            keys, ids = titles
+            position = bisect_right(keys, key)
+            keys.insert(position, key)
+            ids.insert(position, book_id)
+
+    def by_author(self, author: str) -> List[str]:
+        """ISBNs of the books by `author` (case-insensitive), in the order they were added."""
+        return [self._isbns[i] for i in self._by_author.get(author.casefold(), ())]
+
+    def title_prefix(self, prefix: str, limit: int = SEARCH_LIMIT) -> List[str]:
+        """ISBNs of books whose title starts with `prefix` (case-insensitive), by title."""
+        key = prefix.casefold()
+        result = []
+        position = bisect_left(self._title_keys, key)
+        while position < len(self._title_keys) and len(result) < limit:
+            if not self._title_keys[position].startswith(key):
+                break
+            result.append(self._isbns[self._title_ids[position]])
+            position += 1
+        return result
+
+    def listing(self, author: Optional[str] = None, sort: Optional[str] = None,
+                after: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """(position, ISBN) of the books in the order they were added, or by title with sort="title".
+
+        `author` keeps only that author's books (case-insensitive). `after` is
+        a position from an earlier listing; the listing resumes right after
+        that book, found by binary search, so books added in between neither
+        repeat nor shift the rest.
+        """
+        if sort == "title":
+            if author is None:
+                keys, ids = self._title_keys, self._title_ids
+            else:
+                keys, ids = self._titles_by(author.casefold())
+            start = 0
+            if after is not None:
+                # equal titles are in id order
+                key = self._title_of[after]
+                low = bisect_left(keys, key)
+                start = bisect_right(ids, after, low, bisect_right(keys, key, low))
+        elif author is not None:
+            ids = self._by_author.get(author.casefold(), array("I"))
+            start = 0 if after is None else bisect_right(ids, after)
+        else:
+            ids = range(len(self._isbns))
+            start = 0 if after is None else after + 1
+        for position in range(start, len(ids)):
+            book_id = ids[position]
+            yield book_id, self._isbns[book_id]
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> List[str]:
+        """ISBNs of books whose title or author contains every word of `query`."""
+        words = set(tokenize(query))
+        if not words:
+            return []
+        postings = sorted((self._tokens.get(word, ()) for word in words), key=len)
+        smallest, others = postings[0], postings[1:]
+        result = []
+        for book_id in smallest:
+            if all(_contains(posting, book_id) for posting in others):
+                result.append(self._isbns[book_id])
+                if len(result) == limit:
+                    break
+        return result
+
+    def _titles_by(self, author_key: str) -> Tuple[List[str], array]:
+        titles = self._author_titles.get(author_key)
+        if titles is None:
+            titles = self._author_titles[author_key] = self._title_order(self._by_author.get(author_key, ()))
+        return titles
+
+    def _title_order(self, book_ids: Iterable[int]) -> Tuple[List[str], array]:
+        titles = sorted((self._title_of[book_id], book_id) for book_id in book_ids)
+        return [key for key, _ in titles], array("I", (book_id for _, book_id in titles))
+
+    def _add_postings(self, book: Book) -> int:
+        book_id = len(self._isbns)
+        self._isbns.append(book.isbn)
+        self._title_of.append(book.title.casefold())
+        self._by_author.setdefault(book.author.casefold(), array("I")).append(book_id)
+        for word in set(tokenize(book.title) + tokenize(book.author)):
+            self._tokens.setdefault(word, array("I")).append(book_id)
+        return book_id
+
+
+def _contains(posting: array, book_id: int) -> bool:
+    # postings are appended in id order, so they are sorted
+    position = bisect_left(posting, book_id)
+    return position < len(posting) and posting[position] == book_id
@@ -0,0 +1,169 @@
+"""
+Name: Replace with your name
+Date: 2025-11-19
+Assignment: Library System - server.py
+
+Network front-end: one JSON request per line over TCP, one JSON response per line.
+
+    {"id": 1, "op": "lend_book", "args": {"member_id": "M1", "isbn": "123"}}
+    {"id": 1, "ok": true, "result": "Book 'Dune' lent to Ann."}
+
+Clients may pipeline: send any number of requests without waiting, and the
+responses come back in the same order. Run: python server.py [--port 8765] [--dir .]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Set, Tuple
+from concurrency import ConcurrentLibrary
+from storage import BOOKS_FILE, MEMBERS_FILE, JOURNAL_FILE
+
+HOST = "127.0.0.1"
+PORT = 8765
+# threads running Library calls; each may be waiting on the persistence writer
+WORKERS = 32
+
+# operation -> argument names, in call order
+OPERATIONS: Dict[str, Tuple[str, ...]] = {
+    "add_book": ("title", "author", "isbn"),
+    "add_copy": ("isbn",),
+    "register_member": ("name", "member_id"),
+    "lend_book": ("member_id", "isbn"),
+    "take_return": ("member_id", "isbn"),
+    "place_hold": ("member_id", "isbn"),
+    "cancel_hold": ("member_id", "isbn"),
+    "library_report": (),
+}
+
+
+class LibraryServer:
+    """asyncio TCP server in front of a ConcurrentLibrary.
+
+    Library calls run on a thread pool, so waiting for a change to be
+    persisted never blocks the event loop, and changes from all connections
+    are group-committed by the library's writer thread. Requests on one
+    connection are executed in order, one after another.
+    """
+
+    def __init__(self, lib: ConcurrentLibrary, workers: int = WORKERS):
+        self.lib = lib
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="library-desk")
+        self._server: Optional[asyncio.AbstractServer] = None
+        # open client connections and the tasks serving them, ended by stop()
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._handlers: Set[asyncio.Task] = set()
+
+    async def start(self, host: str = HOST, port: int = PORT) -> int:
+        """Start listening; returns the port (useful with port 0)."""
+        self._server = await asyncio.start_server(self._serve, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # closing the server only stops new connections; end the open ones too
+            for writer in list(self._writers):
+                writer.close()
+            # a closed connection reads as end of input, so each handler finishes its
+            # request and returns (cancelling them makes asyncio log the CancelledError)
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=True)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        handler = asyncio.current_task()
+        self._writers.add(writer)
+        self._handlers.add(handler)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                response = await self._dispatch(loop, line)
+                writer.write(json.dumps(response, separators=(",", ":")).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            self._handlers.discard(handler)
+            writer.close()
+
+    async def _dispatch(self, loop: asyncio.AbstractEventLoop, line: bytes) -> Dict:
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            return {"id": None, "ok": False, "error": "Request is not valid JSON."}
+        if not isinstance(request, dict):
+            return {"id": None, "ok": False, "error": "Request must be a JSON object."}
+        request_id = request.get("id")
+        op = request.get("op")
+        if op not in OPERATIONS:
+            return {"id": request_id, "ok": False, "error": f"Unknown operation '{op}'."}
+        args = request.get("args") or {}
+        if not isinstance(args, dict):
+            return {"id": request_id, "ok": False, "error": "Arguments must be a JSON object."}
+        missing = [name for name in OPERATIONS[op] if not isinstance(args.get(name), str)]
+        if missing:
+            return {"id": request_id, "ok": False, "error": f"Missing or non-string arguments: {', '.join(missing)}."}
+        call = getattr(self.lib, op)
+        try:
+            result = await loop.run_in_executor(self.executor, call, *(args[name] for name in OPERATIONS[op]))
+        except Exception as e:
+            return {"id": request_id, "ok": False, "error": f"Error: {e}"}
+        return {"id": request_id, "ok": True, "result": result}
+
+
+def open_library(directory: str) -> ConcurrentLibrary:
+    lib = ConcurrentLibrary(os.path.join(directory, BOOKS_FILE), os.path.join(directory, MEMBERS_FILE),
+                            journal_file=os.path.join(directory, JOURNAL_FILE), lazy_members=True)
+    lib.load_data()
+    return lib
+
+
+async def run(host: str, port: int, directory: str, metrics_file: Optional[str] = None) -> None:
+    lib = open_library(directory)
+    if metrics_file:
+        lib.enable_metrics(dump_file=metrics_file)
+    server = LibraryServer(lib)
+    port = await server.start(host, port)
+    print(f"Library server listening on {host}:{port}")
+    # stop on SIGTERM as on Ctrl+C, so the snapshot is still written
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except NotImplementedError:
+        pass  # Windows
+    try:
+        await server.serve_forever()
+    finally:
+        await server.stop()
+        lib.save_data()
+        lib.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the library over TCP (JSON lines).")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--dir", default=".", help="directory holding books.json, members.json and the journal")
+    parser.add_argument("--metrics", help="time every operation and dump the metrics to this JSON file")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args.host, args.port, args.dir, args.metrics))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Name: Replace with your name
+Date: 2025-11-19
+Assignment: Library System - snapshot.py
+"""
+
+import json
+import os
+import re
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+CHUNK_SIZE = 1 << 16
+# sidecar file holding the byte offset of every record in a snapshot
+INDEX_SUFFIX = ".idx"
+# the file a snapshot replaced, kept by write_snapshot(keep_previous=True)
+PREVIOUS_SUFFIX = ".prev"
+_DECODER = json.JSONDecoder()
+_ENCODER = json.JSONEncoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_SEPARATOR = re.compile(r"[ \t\n\r]*([,\]])[ \t\n\r]*")
+
+
+class SnapshotError(Exception):
+    """Raised when the snapshot files share no generation: no save of them is complete."""
+
+
+def write_snapshot(path: str, key: str, generation: int, records: Iterable[Dict],
+                   index_field: Optional[str] = None, keep_previous: bool = False) -> int:
+    """Atomically replace `path` with {"generation": ..., key: records}, one record per line.
+
+    The data goes to a temp file next to the target, is fsynced, and is then
+    renamed over the target, so a crash leaves either the old or the new file.
+    With `keep_previous`, the old file is first renamed to `path + PREVIOUS_SUFFIX`
+    (a crash between the two renames leaves only that one).
+    With `index_field`, the byte range of each record is also saved to
+    `path + INDEX_SUFFIX`, keyed by that field (see read_index()).
+    Returns the number of bytes written, index included.
+    """
+    keys, starts, ends = [], [], []
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pos = f.write(f"{{\"generation\": {generation}, {json.dumps(key)}: [".encode("utf-8"))
+        for i, record in enumerate(records):
+            line = _ENCODER.encode(record).encode("utf-8")
+            pos += f.write(b",\n" if i else b"\n")
+            if index_field:
+                keys.append(record[index_field])
+                starts.append(pos)
+                ends.append(pos + len(line))
+            pos += f.write(line)
+        pos += f.write(b"\n]}\n")
+        f.flush()
+        os.fsync(f.fileno())
+    if keep_previous and os.path.exists(path):
+        os.replace(path, path + PREVIOUS_SUFFIX)
+    os.replace(tmp_path, path)
+    _fsync_dir(os.path.dirname(os.path.abspath(path)))
+
+    if index_field:
+        index = {"generation": generation, "size": pos, "keys": keys, "starts": starts, "ends": ends}
+        data = json.dumps(index, separators=(",", ":")).encode("utf-8")
+        _write_atomic(path + INDEX_SUFFIX, data)
+        pos += len(data)
+    return pos
+
+
+def read_index(path: str, generation: int) -> Optional[Dict[str, Tuple[int, int]]]:
+    """Return {key: (start, end)} saved by write_snapshot() for `path`.
+
+    Returns None if there is no index, or it does not match the snapshot
+    (another generation, or a file that has been modified since).
+    """
+    index_path = path + INDEX_SUFFIX
+    if not os.path.exists(index_path) or not os.path.exists(path):
+        return None
+    with open(index_path, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    if index.get("generation") != generation or index.get("size") != os.path.getsize(path):
+        return None
+    return dict(zip(index["keys"], zip(index["starts"], index["ends"])))
+
+
+class SnapshotReader:
+    """Incremental reader for a snapshot file.
+
+    Parses the record array one element at a time from fixed-size chunks, so
+    memory stays bounded by the largest single record rather than the file.
+    Accepts both {"generation": N, key: [...]} and the older bare-list format
+    (generation 0); a missing file reads as an empty generation 0.
+    """
+
+    def __init__(self, path: str, key: str, chunk_size: int = CHUNK_SIZE):
+        self.path = path
+        self.key = key
+        self.chunk_size = chunk_size
+        self.generation = 0
+
+    def read_generation(self) -> int:
+        """Return the generation stored in the file without building its records."""
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            buf = _ChunkBuffer(f, self.chunk_size)
+            if buf.peek() == "[":
+                return 0
+            for name in _object_keys(buf):
+                if name == "generation":
+                    self.generation = buf.value()
+                    return self.generation
+                if name == self.key:
+                    # generation written after the records: skip them without keeping any
+                    for _ in _array_items(buf):
+                        pass
+                else:
+                    buf.value()
+        return 0
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self._scan("utf-8", spans=False)
+
+    def spans(self) -> Iterator[Tuple[Dict, int, int]]:
+        """Yield (record, start, end) with the byte range of each record in the file.
+
+        The file is decoded as latin-1 so that character offsets are byte offsets;
+        use from_latin1() on string fields that may hold non-ASCII text, and
+        read_span() to decode a record properly later.
+        """
+        return self._scan("latin-1", spans=True)
+
+    def _scan(self, encoding: str, spans: bool) -> Iterator:
+        if not os.path.exists(self.path):
+            return
+        # newline="" keeps offsets exact on files written with \r\n line endings
+        with open(self.path, "r", encoding=encoding, newline="") as f:
+            buf = _ChunkBuffer(f, self.chunk_size)
+            if buf.peek() != "[":
+                for name in _object_keys(buf):
+                    if name == self.key:
+                        break
+                    elif name == "generation":
+                        self.generation = buf.value()
+                    else:
+                        buf.value()
+                else:
+                    return
+            for record in _array_items(buf):
+                if spans:
+                    yield (record,) + buf.span
+                else:
+                    yield record
+            # anything after the records (e.g. a trailing generation)
+            if buf.peek() == ",":
+                buf.pos += 1
+                for name in _object_keys(buf, opened=True):
+                    value = buf.value()
+                    if name == "generation":
+                        self.generation = value
+
+
+def read_span(f, start: int, end: int) -> Dict:
+    """Decode one record from a binary file handle, given a span from SnapshotReader.spans()."""
+    f.seek(start)
+    return json.loads(f.read(end - start))
+
+
+def from_latin1(text: str) -> str:
+    """Undo the latin-1 decoding used by SnapshotReader.spans() for one string value."""
+    try:
+        return text.encode("latin-1").decode("utf-8")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        # already real text (came from \u escapes)
+        return text
+
+
+class _ChunkBuffer:
+    """A sliding window over a text file for incremental JSON decoding."""
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        # file offset of text[0], and (start, end) offsets of the last array item
+        self.base = 0
+        self.span = (0, 0)
+        self.eof = False
+
+    def _fill(self) -> bool:
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # drop what has already been consumed
+        self.base += self.pos
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ("" at end of file)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"expected {char!r} but found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.eof or not self._fill():
+                    raise
+                continue
+            # a number at the very end of the window may continue in the next chunk
+            if end == len(self.text) and not self.eof and self._fill():
+                continue
+            self.span = (self.base + self.pos, self.base + end)
+            self.pos = end
+            return obj
+
+
+def _object_keys(buf: _ChunkBuffer, opened: bool = False) -> Iterator[str]:
+    """Yield each key of a JSON object; the caller must consume the value.
+
+    With `opened`, the "{" (and any keys before) have already been consumed.
+    """
+    if not opened:
+        buf.expect("{")
+        if buf.peek() == "}":
+            buf.pos += 1
+            return
+    while True:
+        name = buf.value()
+        buf.expect(":")
+        yield name
+        sep = buf.peek()
+        buf.pos += 1
+        if sep == "}":
+            return
+        if sep != ",":
+            raise ValueError(f"expected ',' or '}}' but found {sep!r}")
+
+
+def _array_items(buf: _ChunkBuffer) -> Iterator:
+    buf.expect("[")
+    if buf.peek() == "]":
+        buf.pos += 1
+        return
+    scan = _DECODER.scan_once
+    separator = _SEPARATOR.match
+    while True:
+        # fast path: the value and the separator after it are both inside the window
+        text = buf.text
+        try:
+            obj, end = scan(text, buf.pos)
+            match = separator(text, end)
+        except (StopIteration, json.JSONDecodeError):
+            match = None
+        if match is not None and match.end() < len(text):
+            buf.span = (buf.base + buf.pos, buf.base + end)
+            buf.pos = match.end()
+            sep = match.group(1)
+        else:
+            obj = buf.value()
+            sep = buf.peek()
+            buf.pos += 1
+            if sep == ",":
+                buf.peek()  # back onto the fast path at the next value
+        yield obj
+        if sep == "]":
+            return
+        if sep != ",":
+            raise ValueError(f"expected ',' or ']' but found {sep!r}")
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(os.path.dirname(os.path.abspath(path)))
+
+
+def _fsync_dir(directory: str) -> None:
+    # make the rename itself durable (not supported on Windows)
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,76 @@
+"""
+Name: Replace with your name
+Date: 2025-11-19
+Assignment: Library System - stats.py
+"""
+
+from typing import Iterable, List, Optional
+from book import Book
+from member import Member
+
+
+class LibraryStats:
+    """Counters behind Library.library_report(), kept up to date on every change."""
+
+    __slots__ = ("total_books", "total_members", "active_members", "borrowed_books",
+                 "most_borrowed_isbn", "most_borrowed_count")
+
+    def __init__(self):
+        self.total_books = 0
+        self.total_members = 0
+        # members with at least one borrowed book
+        self.active_members = 0
+        # copies currently on loan
+        self.borrowed_books = 0
+        # borrow_count only ever grows, so the maximum can be tracked without a heap
+        self.most_borrowed_isbn: Optional[str] = None
+        self.most_borrowed_count = 0
+
+    @classmethod
+    def from_scan(cls, books: Iterable[Book], members: Iterable[Member]) -> "LibraryStats":
+        """Build the counters with one full pass over books and members."""
+        stats = cls()
+        for book in books:
+            stats.add_book(book)
+            stats.borrowed_books += book.on_loan
+        for member in members:
+            stats.total_members += 1
+            if member.borrowed_books:
+                stats.active_members += 1
+        return stats
+
+    def add_book(self, book: Book) -> None:
+        self.total_books += 1
+        self._saw_borrow_count(book)
+
+    def register_member(self) -> None:
+        self.total_members += 1
+
+    def lend(self, book: Book, member_was_active: bool) -> None:
+        self.borrowed_books += 1
+        if not member_was_active:
+            self.active_members += 1
+        self._saw_borrow_count(book)
+
+    def take_return(self, book_was_borrowed: bool, member_still_active: bool) -> None:
+        if book_was_borrowed:
+            self.borrowed_books -= 1
+        if not member_still_active:
+            self.active_members -= 1
+
+    def differences(self, other: "LibraryStats") -> List[str]:
+        """Describe every counter that differs from `other` (empty if consistent).
+
+        Only the most-borrowed count is compared: ties may pick different books.
+        """
+        diffs = []
+        for name in ("total_books", "total_members", "active_members", "borrowed_books", "most_borrowed_count"):
+            mine, theirs = getattr(self, name), getattr(other, name)
+            if mine != theirs:
+                diffs.append(f"{name}: maintained {mine}, full scan {theirs}")
+        return diffs
+
+    def _saw_borrow_count(self, book: Book) -> None:
+        if self.most_borrowed_isbn is None or book.borrow_count > self.most_borrowed_count:
+            self.most_borrowed_isbn = book.isbn
+            self.most_borrowed_count = book.borrow_count
@@ -0,0 +1,831 @@
+"""
+Name: Replace with your name
+Date: 2025-11-19
+Assignment: Library System - storage.py
+"""
+
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from itertools import groupby
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from book import Book
+from member import Member
+from journal import Journal, apply_record
+from holds import HoldQueues
+from loans import Loan, LoanLedger
+from search import CatalogIndex, SEARCH_LIMIT, tokenize
+from snapshot import (PREVIOUS_SUFFIX, SnapshotError, SnapshotReader, from_latin1, read_index, read_span,
+                      write_snapshot)
+
+BOOKS_FILE = "books.json"
+MEMBERS_FILE = "members.json"
+JOURNAL_FILE = "library.journal"
+LOANS_FILE = "loans.json"
+HOLDS_FILE = "holds.json"
+# fold the journal into the snapshot files after this many records
+COMPACT_EVERY = 1000
+# how often load() reports progress, in records
+PROGRESS_EVERY = 10000
+# members kept decoded in lazy mode, besides those changed since the last snapshot
+MEMBER_CACHE_SIZE = 10000
+
+ProgressCallback = Callable[[str, int], None]
+
+
+class JsonStorage:
+    """Everything held in memory, persisted as books.json/members.json snapshots.
+
+    With a journal, each change appends one record and the snapshots are only
+    rewritten on compaction; without one, every change rewrites all files.
+    The loan ledger and the hold queues are snapshots of their own, next to
+    books.json unless given: loans.json with one [member_id, isbn, lent_at,
+    due_at, returned_at] list per loan, holds.json with one [isbn,
+    [member_id, ...]] list per queue. Each save keeps the files it replaces
+    as books.json.prev etc., which load() goes back to after a save that did
+    not finish.
+    """
+
+    def __init__(self, books_file: str = BOOKS_FILE, members_file: str = MEMBERS_FILE,
+                 journal_file: Optional[str] = None, compact_every: int = COMPACT_EVERY,
+                 lazy_members: bool = False, member_cache_size: int = MEMBER_CACHE_SIZE,
+                 loans_file: Optional[str] = None, holds_file: Optional[str] = None):
+        self.books: Dict[str, Book] = {}
+        # lazy mode: members are indexed at load and only decoded when first looked up
+        self.lazy_members = lazy_members
+        self.members: MutableMapping = LazyMembers(members_file, member_cache_size) if lazy_members else {}
+        self.loans = LoanLedger()
+        self.holds = HoldQueues()
+        self.books_file = books_file
+        self.members_file = members_file
+        self.loans_file = loans_file or os.path.join(os.path.dirname(books_file), LOANS_FILE)
+        self.holds_file = holds_file or os.path.join(os.path.dirname(books_file), HOLDS_FILE)
+        self.journal: Optional[Journal] = Journal(journal_file) if journal_file else None
+        self.compact_every = compact_every
+        # generation of the snapshot pair on disk; bumped by every save()
+        self.generation = 0
+        # changes held back between begin_batch() and end_batch()
+        self._batch: Optional[List[Dict]] = None
+        # bytes written by the last save() (both snapshots and the index), and by all saves
+        self.last_save_bytes = 0
+        self.snapshot_bytes = 0
+        # called with those bytes after every save(), compactions included (see Library.enable_metrics())
+        self.on_save: Optional[Callable[[int], None]] = None
+
+    def commit(self, op: str, book: Optional[Book] = None, member: Optional[Member] = None,
+               loan: Optional[Loan] = None, copy: Optional[str] = None) -> None:
+        """Persist a single change: append to the journal, or rewrite everything without one.
+
+        `copy` is the barcode of the copy added by an "add_copy".
+        """
+        if self.lazy_members and member is not None:
+            # keep the changed member in memory until it is part of a snapshot
+            self.members.pin(member)
+        record = {"op": op, "gen": self.generation}
+        if self.journal is not None:
+            if op == "add_book":
+                record.update(title=book.title, author=book.author, isbn=book.isbn)
+            elif op == "add_copy":
+                record.update(isbn=book.isbn, copy=copy)
+            elif op == "register_member":
+                record.update(name=member.name, member_id=member.member_id)
+            else:
+                record.update(member_id=member.member_id, isbn=book.isbn)
+                if loan is not None:
+                    if op == "lend":
+                        record.update(at=loan.lent_at, due=loan.due_at)
+                    else:
+                        record.update(at=loan.returned_at)
+        if self._batch is not None:
+            self._batch.append(record)
+            return
+        self._persist([record])
+
+    def begin_batch(self) -> None:
+        """Hold back persistence until end_batch(), which writes all changes at once."""
+        self._batch = []
+
+    def end_batch(self, sync: bool = True) -> None:
+        """Write the batched changes; sync=False defers the journal fsync to sync()."""
+        records, self._batch = self._batch, None
+        if records:
+            self._persist(records, sync)
+
+    def sync(self) -> None:
+        if self.journal is not None:
+            self.journal.sync()
+
+    def _persist(self, records: List[Dict], sync: bool = True) -> None:
+        if self.journal is None:
+            self.save()
+            return
+        self.journal.append_many(records, sync)
+        if len(self.journal) >= self.compact_every:
+            self.save()  # compaction
+
+    def save(self) -> None:
+        """Write full snapshots of books, members, loans and holds (and empty the journal, if any).
+
+        Each file is replaced atomically, keeping the old one as *.prev, and all are stamped
+        with the same, new generation number.
+        """
+        generation = self.generation + 1
+        saved = True
+        written = 0
+        # books
+        try:
+            books_list = [b.to_dict() for b in self.books.values()]
+            written += write_snapshot(self.books_file, "books", generation, books_list, keep_previous=True)
+        except Exception as e:
+            print(f"Error saving books: {e}")
+            saved = False
+
+        # members
+        try:
+            members_list = [m.to_dict() for m in self.members.values()]
+            if self.lazy_members:
+                self.members.close()  # the file is about to be replaced
+            # lazy mode also saves an offset index so the next start does not scan the file
+            written += write_snapshot(self.members_file, "members", generation, members_list,
+                                      index_field="member_id" if self.lazy_members else None,
+                                      keep_previous=True)
+        except Exception as e:
+            print(f"Error saving members: {e}")
+            saved = False
+
+        # loans and holds
+        for key, path, table in self._tables():
+            try:
+                written += write_snapshot(path, key, generation, table.rows(), keep_previous=True)
+            except Exception as e:
+                print(f"Error saving {key}: {e}")
+                saved = False
+
+        self.last_save_bytes = written
+        self.snapshot_bytes += written
+        if self.on_save is not None:
+            self.on_save(written)
+        if not saved:
+            return
+        self.generation = generation
+        if self.lazy_members:
+            self.members.reindex()
+        # everything in the journal is now part of the snapshot
+        if self.journal is not None:
+            self.journal.truncate()
+
+    def load(self, progress: Optional[ProgressCallback] = None) -> None:
+        """Load snapshots and replay the journal.
+
+        Goes back to the *.prev files where a save did not finish; raises SnapshotError
+        if not even those make a complete save.
+        Records are streamed from the files one at a time; `progress`, if given, is called
+        as progress(kind, count) every PROGRESS_EVERY records and once at the end of each file.
+        """
+        # check the files before building anything
+        readable = self._restore_complete_save()
+        books_reader = SnapshotReader(self.books_file, "books")
+        members_reader = SnapshotReader(self.members_file, "members")
+        tables = [(key, SnapshotReader(path, key), table) for key, path, table in self._tables()
+                  if path in readable]
+
+        # load books
+        if self.books_file in readable:
+            count = 0
+            try:
+                for bd in books_reader:
+                    b = Book.from_dict(bd)
+                    self.books[b.isbn] = b
+                    count += 1
+                    if progress and count % PROGRESS_EVERY == 0:
+                        progress("books", count)
+            except Exception as e:
+                print(f"Error loading books data: {e}")
+            if progress:
+                progress("books", count)
+
+        # load members (or only index them in lazy mode)
+        if self.members_file in readable and self.lazy_members:
+            try:
+                self.members.reindex(progress)
+            except Exception as e:
+                print(f"Error loading members data: {e}")
+        elif self.members_file in readable:
+            count = 0
+            try:
+                for md in members_reader:
+                    m = Member.from_dict(md)
+                    self.members[m.member_id] = m
+                    count += 1
+                    if progress and count % PROGRESS_EVERY == 0:
+                        progress("members", count)
+            except Exception as e:
+                print(f"Error loading members data: {e}")
+            if progress:
+                progress("members", count)
+
+        # load the loan ledger and hold queues
+        self.loans.clear()
+        self.holds.clear()
+        for key, reader, table in tables:
+            try:
+                table.load(reader)
+            except Exception as e:
+                print(f"Error loading {key} data: {e}")
+            if progress:
+                progress(key, len(table))
+
+        # replay changes recorded since the last snapshot
+        if self.journal is not None:
+            try:
+                for record in self.journal.replay():
+                    # records from an older generation are already in the snapshot
+                    if record.get("gen", self.generation) < self.generation:
+                        continue
+                    apply_record(self.books, self.members, record, self.loans, self.holds)
+            except Exception as e:
+                print(f"Error replaying journal: {e}")
+
+    def _restore_complete_save(self) -> Set[str]:
+        """Put the newest generation that all snapshot files have in place; return the readable files.
+
+        A save interrupted partway leaves the files it replaced as *.prev, and the
+        rest at the older generation. Those are renamed back (the journal, which
+        that save did not truncate, replays the rest); with no such generation,
+        raise SnapshotError.
+        """
+        # snapshot file -> {generation: the file, or its *.prev, holding it}
+        found: Dict[str, Dict[int, str]] = {}
+        files = [("books", self.books_file), ("members", self.members_file)]
+        for key, path in files + [(key, path) for key, path, _ in self._tables()]:
+            found[path] = {}
+            for candidate in (path, path + PREVIOUS_SUFFIX):
+                if not os.path.exists(candidate):
+                    continue
+                try:
+                    found[path].setdefault(SnapshotReader(candidate, key).read_generation(), candidate)
+                except Exception as e:
+                    print(f"Error loading {key} data: {e}")
+            # books/members never saved read as an empty generation 0; loans/holds files
+            # are missing when saved before they existed, and then match any generation
+            if (key, path) in files and not os.path.exists(path) and not os.path.exists(path + PREVIOUS_SUFFIX):
+                found[path][0] = path
+        # unreadable files were reported above and hold back no generation
+        readable = {path: generations for path, generations in found.items() if generations}
+        complete = set.intersection(*(set(generations) for generations in readable.values())) \
+            if readable else {0}
+        if not complete:
+            raise SnapshotError(
+                "no generation is in all of " + ", ".join(
+                    f"{path} ({', '.join(map(str, sorted(generations)))})" for path, generations in readable.items()
+                ) + "; refusing to load a torn snapshot."
+            )
+        self.generation = max(complete)
+        for path, generations in readable.items():
+            source = generations[self.generation]
+            if source != path:
+                print(f"{path} is from an unfinished save; going back to generation {self.generation}.")
+                os.replace(source, path)
+        return set(readable)
+
+    def _tables(self) -> List[Tuple[str, str, object]]:
+        # (snapshot key, file, structure with rows()/load()) saved alongside books and members
+        return [("loans", self.loans_file, self.loans), ("holds", self.holds_file, self.holds)]
+
+    def catalog_index(self) -> CatalogIndex:
+        """Search indexes over the books, built in memory."""
+        return CatalogIndex.from_books(self.books.values())
+
+    def close(self) -> None:
+        if self.journal is not None:
+            self.journal.close()
+        if self.lazy_members:
+            self.members.close()
+
+
+class LazyMembers(MutableMapping):
+    """member_id -> Member view over members.json that decodes members on first access.
+
+    Loading only records the byte range of each member in the file. Looked-up
+    members are kept in an LRU cache of `cache_size`; members added or changed
+    since the last snapshot are pinned in memory until the next save.
+    """
+
+    def __init__(self, path: str, cache_size: int = MEMBER_CACHE_SIZE):
+        self.path = path
+        self.cache_size = cache_size
+        self._spans: Dict[str, Tuple[int, int]] = {}
+        self._cache: "OrderedDict[str, Member]" = OrderedDict()
+        self._pinned: Dict[str, Member] = {}
+        self._file = None
+
+    def reindex(self, progress: Optional[ProgressCallback] = None) -> None:
+        """(Re)build the offset index; pinned members are assumed saved.
+
+        Uses the index file saved with the snapshot when it is current, and
+        otherwise scans members.json once.
+        """
+        self.close()
+        self._pinned.clear()
+        reader = SnapshotReader(self.path, "members")
+        spans = read_index(self.path, reader.read_generation())
+        if spans is not None:
+            self._spans = spans
+            if progress:
+                progress("members", len(spans))
+            return
+        self._spans = {}
+        count = 0
+        for record, start, end in reader.spans():
+            self._spans[from_latin1(record["member_id"])] = (start, end)
+            count += 1
+            if progress and count % PROGRESS_EVERY == 0:
+                progress("members", count)
+        if progress:
+            progress("members", count)
+
+    def pin(self, member: Member) -> None:
+        self._cache.pop(member.member_id, None)
+        self._pinned[member.member_id] = member
+
+    def __getitem__(self, member_id: str) -> Member:
+        member = self._pinned.get(member_id)
+        if member is not None:
+            return member
+        member = self._cache.get(member_id)
+        if member is not None:
+            self._cache.move_to_end(member_id)
+            return member
+        start, end = self._spans[member_id]
+        if self._file is None:
+            self._file = open(self.path, "rb")
+        member = Member.from_dict(read_span(self._file, start, end))
+        self._cache[member_id] = member
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return member
+
+    def __setitem__(self, member_id: str, member: Member) -> None:
+        self.pin(member)
+
+    def __delitem__(self, member_id: str) -> None:
+        found = self._pinned.pop(member_id, None) is not None
+        found = self._spans.pop(member_id, None) is not None or found
+        self._cache.pop(member_id, None)
+        if not found:
+            raise KeyError(member_id)
+
+    def __contains__(self, member_id) -> bool:
+        return member_id in self._pinned or member_id in self._spans
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._spans
+        for member_id in self._pinned:
+            if member_id not in self._spans:
+                yield member_id
+
+    def __len__(self) -> int:
+        return len(self._spans) + sum(1 for member_id in self._pinned if member_id not in self._spans)
+
+    def values(self) -> Iterator[Member]:
+        # one sequential pass over the file instead of a seek per member; bypasses the cache
+        for md in SnapshotReader(self.path, "members"):
+            member_id = md["member_id"]
+            if member_id in self._pinned:
+                yield self._pinned[member_id]
+            elif member_id in self._spans:
+                yield self._cache.get(member_id) or Member.from_dict(md)
+        for member_id, member in self._pinned.items():
+            if member_id not in self._spans:
+                yield member
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SqliteStorage:
+    """Books, members, loans and holds kept in an SQLite database instead of in memory.
+
+    `books` and `members` are mappings that run an indexed query per lookup, so
+    only the rows a caller touches are ever materialized. Assigning into a
+    mapping writes the row; commit() writes the loan change for lend/return and
+    commits, so every Library operation is one short transaction. The loan
+    ledger and hold queues write their own rows before commit() is called.
+
+    Pass check_same_thread=False to use the connection from more than one
+    thread (ConcurrentLibrary does so and serializes all access itself).
+    """
+
+    def __init__(self, path: str = "library.db", check_same_thread: bool = True):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=check_same_thread)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS books (
+                isbn TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                author TEXT NOT NULL,
+                available INTEGER NOT NULL DEFAULT 1,
+                borrow_count INTEGER NOT NULL DEFAULT 0,
+                copies TEXT
+            );
+            CREATE TABLE IF NOT EXISTS members (
+                member_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS loans (
+                member_id TEXT NOT NULL,
+                isbn TEXT NOT NULL,
+                PRIMARY KEY (member_id, isbn)
+            );
+            -- secondary indexes for search: casefolded title/author and title+author words
+            CREATE TABLE IF NOT EXISTS book_keys (
+                isbn TEXT PRIMARY KEY,
+                title_key TEXT NOT NULL,
+                author_key TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS book_keys_title ON book_keys (title_key);
+            -- also serves author lookups, and lists an author's books by title
+            CREATE INDEX IF NOT EXISTS book_keys_author_title ON book_keys (author_key, title_key);
+            CREATE TABLE IF NOT EXISTS book_tokens (
+                token TEXT NOT NULL,
+                isbn TEXT NOT NULL,
+                PRIMARY KEY (token, isbn)
+            ) WITHOUT ROWID;
+            -- loan ledger; the partial index holds only open loans, ordered by due date
+            CREATE TABLE IF NOT EXISTS loan_history (
+                id INTEGER PRIMARY KEY,
+                member_id TEXT NOT NULL,
+                isbn TEXT NOT NULL,
+                lent_at INTEGER NOT NULL,
+                due_at INTEGER NOT NULL,
+                returned_at INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS loan_history_member ON loan_history (member_id);
+            CREATE INDEX IF NOT EXISTS loan_history_isbn ON loan_history (isbn);
+            CREATE INDEX IF NOT EXISTS loan_history_open ON loan_history (due_at) WHERE returned_at IS NULL;
+            -- hold queues: seq orders each title's queue, oldest hold first
+            CREATE TABLE IF NOT EXISTS holds (
+                seq INTEGER PRIMARY KEY,
+                isbn TEXT NOT NULL,
+                member_id TEXT NOT NULL,
+                UNIQUE (isbn, member_id)
+            );
+            CREATE INDEX IF NOT EXISTS holds_queue ON holds (isbn, seq);
+            """
+        )
+        # databases created before books had several copies
+        if "copies" not in [row[1] for row in self.conn.execute("PRAGMA table_info(books)")]:
+            self.conn.execute("ALTER TABLE books ADD COLUMN copies TEXT")
+        self.books = SqliteBooks(self.conn)
+        # databases created before the search tables existed
+        if self.conn.execute("SELECT NOT EXISTS (SELECT 1 FROM book_keys) AND EXISTS (SELECT 1 FROM books)").fetchone()[0]:
+            for book in list(self.books.values()):
+                self.books.index_search_keys(book)
+        self.conn.commit()
+        self.members = SqliteMembers(self.conn)
+        self.loans = SqliteLoans(self.conn)
+        self.holds = SqliteHolds(self.conn)
+        # inside begin_batch()/end_batch(): changes are written but not yet committed
+        self._in_batch = False
+
+    def commit(self, op: str, book: Optional[Book] = None, member: Optional[Member] = None,
+               loan: Optional[Loan] = None, copy: Optional[str] = None) -> None:
+        if op == "add_copy":
+            self.conn.execute("UPDATE books SET available = ?, copies = ? WHERE isbn = ?",
+                              (book.on_shelf, json.dumps(book.copies), book.isbn))
+        # the loan itself was written by self.loans
+        if op in ("lend", "return"):
+            self.conn.execute(
+                "UPDATE books SET available = ?, borrow_count = ? WHERE isbn = ?",
+                (book.on_shelf, book.borrow_count, book.isbn),
+            )
+            if op == "lend":
+                self.conn.execute("INSERT OR IGNORE INTO loans (member_id, isbn) VALUES (?, ?)",
+                                  (member.member_id, book.isbn))
+            else:
+                self.conn.execute("DELETE FROM loans WHERE member_id = ? AND isbn = ?",
+                                  (member.member_id, book.isbn))
+        if not self._in_batch:
+            self.conn.commit()
+
+    def begin_batch(self) -> None:
+        """Make the following changes one transaction, committed by end_batch()."""
+        self._in_batch = True
+
+    def end_batch(self, sync: bool = True) -> None:
+        self._in_batch = False
+        self.conn.commit()
+
+    def sync(self) -> None:
+        # commits are made durable by SQLite itself
+        pass
+
+    def catalog_index(self) -> "SqliteCatalogIndex":
+        return SqliteCatalogIndex(self.conn)
+
+    def save(self) -> None:
+        # every change is already committed; nothing to rewrite
+        self.conn.commit()
+
+    def load(self, progress: Optional[ProgressCallback] = None) -> None:
+        # rows are read on demand
+        pass
+
+    def import_json(self, books_file: str = BOOKS_FILE, members_file: str = MEMBERS_FILE,
+                    loans_file: Optional[str] = None, holds_file: Optional[str] = None) -> None:
+        """One-off migration of existing JSON snapshot files into the database."""
+        loans_file = loans_file or os.path.join(os.path.dirname(books_file), LOANS_FILE)
+        holds_file = holds_file or os.path.join(os.path.dirname(books_file), HOLDS_FILE)
+        with self.conn:
+            for bd in SnapshotReader(books_file, "books"):
+                self.books[bd["isbn"]] = Book.from_dict(bd)
+            for md in SnapshotReader(members_file, "members"):
+                self.members[md["member_id"]] = Member.from_dict(md)
+            if os.path.exists(loans_file):
+                self.loans.load(SnapshotReader(loans_file, "loans"))
+            if os.path.exists(holds_file):
+                self.holds.load(SnapshotReader(holds_file, "holds"))
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class SqliteBooks(MutableMapping):
+    """ISBN -> Book view over the `books` table."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __getitem__(self, isbn: str) -> Book:
+        row = self.conn.execute(
+            "SELECT title, author, isbn, available, borrow_count, copies FROM books WHERE isbn = ?", (isbn,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(isbn)
+        return _book_from_row(row)
+
+    def __setitem__(self, isbn: str, book: Book) -> None:
+        # an upsert keeps the row (and its rowid, the listing order) of a book already stored
+        self.conn.execute(
+            "INSERT INTO books (isbn, title, author, available, borrow_count, copies) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (isbn) DO UPDATE SET title = excluded.title, author = excluded.author, "
+            "available = excluded.available, borrow_count = excluded.borrow_count, copies = excluded.copies",
+            (isbn, book.title, book.author, book.on_shelf, book.borrow_count,
+             json.dumps(book.copies) if book.copies is not None else None),
+        )
+        self.index_search_keys(book)
+
+    def __delitem__(self, isbn: str) -> None:
+        if self.conn.execute("DELETE FROM books WHERE isbn = ?", (isbn,)).rowcount == 0:
+            raise KeyError(isbn)
+        self.conn.execute("DELETE FROM book_keys WHERE isbn = ?", (isbn,))
+        self.conn.execute("DELETE FROM book_tokens WHERE isbn = ?", (isbn,))
+
+    def index_search_keys(self, book: Book) -> None:
+        """Write the book's rows in the search tables (see SqliteCatalogIndex)."""
+        self.conn.execute("INSERT INTO book_keys (isbn, title_key, author_key) VALUES (?, ?, ?) "
+                          "ON CONFLICT (isbn) DO UPDATE SET title_key = excluded.title_key, "
+                          "author_key = excluded.author_key",
+                          (book.isbn, book.title.casefold(), book.author.casefold()))
+        self.conn.execute("DELETE FROM book_tokens WHERE isbn = ?", (book.isbn,))
+        self.conn.executemany("INSERT OR IGNORE INTO book_tokens (token, isbn) VALUES (?, ?)",
+                              [(word, book.isbn) for word in set(tokenize(book.title) + tokenize(book.author))])
+
+    def __contains__(self, isbn) -> bool:
+        return self.conn.execute("SELECT 1 FROM books WHERE isbn = ?", (isbn,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for (isbn,) in self.conn.execute("SELECT isbn FROM books ORDER BY rowid"):
+            yield isbn
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+
+    def values(self) -> Iterator[Book]:
+        # one streaming query instead of a lookup per key
+        cursor = self.conn.execute(
+            "SELECT title, author, isbn, available, borrow_count, copies FROM books ORDER BY rowid")
+        for row in cursor:
+            yield _book_from_row(row)
+
+
+class SqliteMembers(MutableMapping):
+    """member_id -> Member view over the `members` and `loans` tables."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __getitem__(self, member_id: str) -> Member:
+        row = self.conn.execute("SELECT name FROM members WHERE member_id = ?", (member_id,)).fetchone()
+        if row is None:
+            raise KeyError(member_id)
+        loans = [isbn for (isbn,) in self.conn.execute(
+            "SELECT isbn FROM loans WHERE member_id = ? ORDER BY rowid", (member_id,))]
+        return Member(name=row[0], member_id=member_id, borrowed_books=loans)
+
+    def __setitem__(self, member_id: str, member: Member) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO members (member_id, name) VALUES (?, ?)", (member_id, member.name))
+        self.conn.execute("DELETE FROM loans WHERE member_id = ?", (member_id,))
+        self.conn.executemany("INSERT OR IGNORE INTO loans (member_id, isbn) VALUES (?, ?)",
+                              [(member_id, isbn) for isbn in member.borrowed_books])
+
+    def __delitem__(self, member_id: str) -> None:
+        if self.conn.execute("DELETE FROM members WHERE member_id = ?", (member_id,)).rowcount == 0:
+            raise KeyError(member_id)
+        self.conn.execute("DELETE FROM loans WHERE member_id = ?", (member_id,))
+
+    def __contains__(self, member_id) -> bool:
+        return self.conn.execute("SELECT 1 FROM members WHERE member_id = ?", (member_id,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for (member_id,) in self.conn.execute("SELECT member_id FROM members ORDER BY rowid"):
+            yield member_id
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM members").fetchone()[0]
+
+    def values(self) -> Iterator[Member]:
+        # one streaming join, grouped per member, instead of a loans query per member
+        cursor = self.conn.execute(
+            "SELECT m.member_id, m.name, l.isbn FROM members m "
+            "LEFT JOIN loans l ON l.member_id = m.member_id ORDER BY m.rowid, l.rowid"
+        )
+        for (member_id, name), rows in groupby(cursor, key=lambda r: (r[0], r[1])):
+            loans = [isbn for _, _, isbn in rows if isbn is not None]
+            yield Member(name=name, member_id=member_id, borrowed_books=loans)
+
+
+class SqliteLoans:
+    """LoanLedger interface over the `loan_history` table."""
+
+    _COLUMNS = "member_id, isbn, lent_at, due_at, returned_at"
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def lend(self, member_id: str, isbn: str, lent_at: int, due_at: int) -> Loan:
+        self.conn.execute("INSERT INTO loan_history (member_id, isbn, lent_at, due_at) VALUES (?, ?, ?, ?)",
+                          (member_id, isbn, lent_at, due_at))
+        return Loan(member_id, isbn, lent_at, due_at, None)
+
+    def close(self, member_id: str, isbn: str, returned_at: int) -> Optional[Loan]:
+        row = self.conn.execute(
+            f"SELECT id, {self._COLUMNS} FROM loan_history "
+            "WHERE member_id = ? AND isbn = ? AND returned_at IS NULL ORDER BY id DESC LIMIT 1",
+            (member_id, isbn),
+        ).fetchone()
+        if row is None:
+            return None
+        self.conn.execute("UPDATE loan_history SET returned_at = ? WHERE id = ?", (returned_at, row[0]))
+        return Loan(*row[1:5], returned_at)
+
+    def open_loan(self, member_id: str, isbn: str) -> Optional[Loan]:
+        row = self.conn.execute(
+            f"SELECT {self._COLUMNS} FROM loan_history "
+            "WHERE member_id = ? AND isbn = ? AND returned_at IS NULL ORDER BY id DESC LIMIT 1",
+            (member_id, isbn),
+        ).fetchone()
+        return Loan(*row) if row is not None else None
+
+    def overdue(self, now: int) -> List[Loan]:
+        cursor = self.conn.execute(
+            f"SELECT {self._COLUMNS} FROM loan_history WHERE returned_at IS NULL AND due_at < ? ORDER BY due_at",
+            (now,))
+        return [Loan(*row) for row in cursor]
+
+    def history(self, member_id: Optional[str] = None, isbn: Optional[str] = None) -> List[Loan]:
+        if member_id is None and isbn is None:
+            raise ValueError("give a member_id, an isbn or both")
+        conditions, params = [], []
+        if member_id is not None:
+            conditions.append("member_id = ?")
+            params.append(member_id)
+        if isbn is not None:
+            conditions.append("isbn = ?")
+            params.append(isbn)
+        cursor = self.conn.execute(
+            f"SELECT {self._COLUMNS} FROM loan_history WHERE {' AND '.join(conditions)} ORDER BY id", params)
+        return [Loan(*row) for row in cursor]
+
+    def lends_since(self, since: int) -> Iterator[Tuple[str, int]]:
+        yield from self.conn.execute("SELECT isbn, lent_at FROM loan_history WHERE lent_at >= ? ORDER BY id",
+                                     (since,))
+
+    def load(self, rows) -> None:
+        self.conn.executemany(f"INSERT INTO loan_history ({self._COLUMNS}) VALUES (?, ?, ?, ?, ?)", rows)
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM loan_history").fetchone()[0]
+
+
+class SqliteHolds:
+    """HoldQueues interface over the `holds` table."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def add(self, isbn: str, member_id: str) -> bool:
+        cursor = self.conn.execute("INSERT OR IGNORE INTO holds (isbn, member_id) VALUES (?, ?)", (isbn, member_id))
+        return cursor.rowcount == 1
+
+    def cancel(self, isbn: str, member_id: str) -> bool:
+        cursor = self.conn.execute("DELETE FROM holds WHERE isbn = ? AND member_id = ?", (isbn, member_id))
+        return cursor.rowcount == 1
+
+    def pop_next(self, isbn: str) -> Optional[str]:
+        row = self.conn.execute("SELECT seq, member_id FROM holds WHERE isbn = ? ORDER BY seq LIMIT 1",
+                                (isbn,)).fetchone()
+        if row is None:
+            return None
+        self.conn.execute("DELETE FROM holds WHERE seq = ?", (row[0],))
+        return row[1]
+
+    def position(self, isbn: str, member_id: str) -> Optional[int]:
+        row = self.conn.execute("SELECT seq FROM holds WHERE isbn = ? AND member_id = ?",
+                                (isbn, member_id)).fetchone()
+        if row is None:
+            return None
+        return self.conn.execute("SELECT COUNT(*) FROM holds WHERE isbn = ? AND seq <= ?",
+                                 (isbn, row[0])).fetchone()[0]
+
+    def queue(self, isbn: str) -> List[str]:
+        cursor = self.conn.execute("SELECT member_id FROM holds WHERE isbn = ? ORDER BY seq", (isbn,))
+        return [member_id for (member_id,) in cursor]
+
+    def count(self, isbn: str) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM holds WHERE isbn = ?", (isbn,)).fetchone()[0]
+
+    def load(self, rows) -> None:
+        self.conn.executemany("INSERT OR IGNORE INTO holds (isbn, member_id) VALUES (?, ?)",
+                              ((isbn, member_id) for isbn, member_ids in rows for member_id in member_ids))
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM holds").fetchone()[0]
+
+
+class SqliteCatalogIndex:
+    """CatalogIndex interface answered from SQLite's book_keys/book_tokens indexes.
+
+    SqliteBooks keeps those tables up to date as books are written, so add() has nothing to do.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def add(self, book: Book) -> None:
+        pass
+
+    def by_author(self, author: str) -> List[str]:
+        cursor = self.conn.execute("SELECT isbn FROM book_keys WHERE author_key = ? ORDER BY rowid",
+                                   (author.casefold(),))
+        return [isbn for (isbn,) in cursor]
+
+    def title_prefix(self, prefix: str, limit: int = SEARCH_LIMIT) -> List[str]:
+        key = prefix.casefold()
+        # range scan on the title index: every key starting with `key` sorts between these two
+        cursor = self.conn.execute(
+            "SELECT isbn FROM book_keys WHERE title_key >= ? AND title_key < ? ORDER BY title_key LIMIT ?",
+            (key, key + "\U0010ffff", limit),
+        )
+        return [isbn for (isbn,) in cursor]
+
+    def listing(self, author: Optional[str] = None, sort: Optional[str] = None,
+                after: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        # positions are book_keys rowids; resuming is a range scan on the (author_key, title_key) index
+        where, params = [], []
+        if author is not None:
+            where.append("author_key = ?")
+            params.append(author.casefold())
+        if after is not None:
+            if sort == "title":
+                where.append("(title_key, rowid) > (SELECT title_key, rowid FROM book_keys WHERE rowid = ?)")
+            else:
+                where.append("rowid > ?")
+            params.append(after)
+        sql = "SELECT rowid, isbn FROM book_keys"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY title_key, rowid" if sort == "title" else " ORDER BY rowid"
+        yield from self.conn.execute(sql, params)
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> List[str]:
+        words = sorted(set(tokenize(query)))
+        if not words:
+            return []
+        sql = " INTERSECT ".join(["SELECT isbn FROM book_tokens WHERE token = ?"] * len(words))
+        cursor = self.conn.execute(f"{sql} LIMIT ?", (*words, limit))
+        return [isbn for (isbn,) in cursor]
+
+
+def _book_from_row(row) -> Book:
+    title, author, isbn, available, borrow_count, copies = row
+    # `available` is the number of copies on the shelf (0 or 1 for a single copy)
+    return Book(title=title, author=author, isbn=isbn, available=available, borrow_count=borrow_count,
+                copies=json.loads(copies) if copies is not None else None)
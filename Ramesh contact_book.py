@@ -9,8 +9,17 @@ Project Title: Contact Book Management System
 # ============================================================================
 # IMPORT STATEMENTS
 # ============================================================================
+import argparse     # For command-line options (benchmark mode)
 import csv          # For reading/writing CSV files
+import heapq        # For taking the first N search results without a full sort
 import json         # For JSON import/export functionality
+import random       # For generating benchmark contacts
+import re           # For stripping phone numbers down to digits
+import threading    # For compacting the change log in the background
+import time         # For timing the search benchmark
+from array import array          # For compact lists of contact IDs in the search index
+from collections import Counter  # For counting shared trigrams in fuzzy search
+from itertools import islice     # For stopping a search after the first N results
 from datetime import datetime  # For timestamping log entries
 import os           # For file system operations
 
@@ -19,6 +28,8 @@ import os           # For file system operations
 # ============================================================================
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Remember where the program was started (for file names given on the command line)
+START_DIR = os.getcwd()
 # Change working directory to script location
 os.chdir(SCRIPT_DIR)
 
@@ -44,15 +55,574 @@ class Colors:
     RESET = '\033[0m'       # Reset to default color
 
 
+# ============================================================================
+# NAME SEARCH - trigram index over casefolded names
+# ============================================================================
+def trigrams(text):
+    """Set of 3-character pieces of `text`, padded with a space at both ends."""
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Substring and typo-tolerant search over contact names.
+    Each name is casefolded once, when its contact is added, and every
+    trigram of it maps to the IDs of the contacts whose name contains it,
+    in ID (file) order. A query only walks the IDs of its rarest trigram and
+    checks those names, stopping once `limit` matches are found. Deleted
+    contacts are skipped, and dropped from the postings once they make up
+    half of them.
+    """
+
+    def __init__(self):
+        self.folded = {}        # contact ID -> casefolded name
+        self.postings = {}      # trigram -> array of contact IDs, ascending
+        self.entries = 0        # IDs in all postings
+        self.stale = 0          # of which belong to deleted contacts
+
+    def add(self, cid, name):
+        """Index a new contact; IDs must be added in ascending order."""
+        folded = name.casefold()
+        self.folded[cid] = folded
+        for gram in trigrams(folded):
+            ids = self.postings.get(gram)
+            if ids is None:
+                ids = self.postings[gram] = array('I')
+            ids.append(cid)
+            self.entries += 1
+
+    def remove(self, cid):
+        folded = self.folded.pop(cid, None)
+        if folded is None:
+            return
+        self.stale += len(trigrams(folded))
+        if self.stale > 1024 and self.stale * 2 > self.entries:
+            self._rebuild()
+
+    def search(self, text, limit=None):
+        """IDs of the contacts whose name contains `text` (ignoring case), ascending; the first `limit`."""
+        text = text.casefold()
+        folded = self.folded
+        if len(text) < 3:
+            # too short to have a trigram: check every name (still no casefolding per name)
+            ids = (cid for cid, name in folded.items() if text in name)
+        else:
+            postings = [self.postings.get(text[i:i + 3]) for i in range(len(text) - 2)]
+            if not all(postings):
+                return []
+            # every match is in the rarest trigram's IDs, but not every ID there is a match
+            ids = (cid for cid in min(postings, key=len) if text in folded.get(cid, ''))
+        return list(ids) if limit is None else list(islice(ids, limit))
+
+    def fuzzy(self, text, limit=10):
+        """
+        IDs of up to `limit` contacts with names close to `text`, best first.
+        Names containing `text` come first, the rest are ranked by how many
+        of the query's trigrams they share, so a mistyped, missing or extra
+        letter still finds the name.
+        """
+        text = text.casefold()
+        # exact matches rank first anyway; only count trigrams when there are too few
+        exact = self.search(text, limit)
+        if len(exact) == limit:
+            return exact
+        grams = trigrams(text)
+        # a typo changes at most 3 trigrams; require all the others to match
+        needed = max(1, len(grams) - 3)
+        # A close name misses at most len(grams) - needed trigrams, so it is in
+        # at least 3 of the rarest len(grams) - needed + 3 postings: count only
+        # those, and leave the common trigrams' long postings alone
+        postings = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+        counted = min(len(postings), len(postings) - needed + 3)
+        seen = Counter()
+        for ids in postings[:counted]:
+            seen.update(ids)
+        rest = len(postings) - counted
+        folded = self.folded
+        grams = list(grams)
+        shared = {}
+        for cid, count in seen.items():
+            if count + rest >= needed and cid in folded:
+                # the few left: count every trigram, a substring of the padded name
+                count = sum(map(f" {folded[cid]} ".__contains__, grams))
+                if count >= needed:
+                    shared[cid] = count
+        return heapq.nsmallest(limit, shared,
+                               key=lambda cid: (text not in folded[cid], -shared[cid], len(folded[cid]), cid))
+
+    def _rebuild(self):
+        # folded is in ascending ID order, so the new postings are too
+        names = self.folded
+        self.__init__()
+        for cid, folded in names.items():
+            self.add(cid, folded)
+
+
+# ============================================================================
+# CONTACT STORE - contacts.csv loaded once and indexed in memory
+# ============================================================================
+CONTACTS_FILE = 'contacts.csv'
+FIELDNAMES = ['Name', 'Phone', 'Email']
+# most suggestions shown when a search finds nothing
+SUGGESTIONS = 5
+# most contacts a name search lists; more means the name typed is too short
+SEARCH_RESULTS = 50
+# country code given to 10-digit numbers typed without one
+DEFAULT_COUNTRY_CODE = '91'
+NON_DIGITS = re.compile(r'[^0-9]+')
+# changes not yet folded into contacts.csv, one JSON record per line
+LOG_SUFFIX = '.log'
+# compact once the log has this many records (or 1/COMPACT_RATIO of the contact count, if more)
+COMPACT_MIN_RECORDS = 1000
+COMPACT_RATIO = 4
+# skipped rows listed after a bulk import
+SHOW_REJECTED = 10
+
+
+def normalize_phone(phone):
+    """
+    E.164-style key for a phone number: '+', country code, then digits only.
+    Spaces, dashes, brackets and dots are dropped, '00' means '+', a leading
+    trunk '0' goes, and 10-digit numbers get DEFAULT_COUNTRY_CODE, so
+    '098765 43210', '+91 98765-43210' and '(987) 654-3210' style input all
+    end up as one key. Returns '' if the text has no digits.
+    """
+    digits = NON_DIGITS.sub('', phone)
+    if not digits:
+        return ''
+    if phone.strip().startswith('+'):
+        return '+' + digits
+    if digits.startswith('00'):
+        return '+' + digits[2:]
+    if len(digits) == 11 and digits.startswith('0'):
+        digits = digits[1:]
+    if len(digits) == 10:
+        return '+' + DEFAULT_COUNTRY_CODE + digits
+    return '+' + digits
+
+
+def valid_phone(key):
+    """True if a normalize_phone() key has 8 to 15 digits (E.164 allows at most 15)."""
+    return 8 <= len(key) - 1 <= 15
+
+
+def normalize_email(email):
+    """Key for an email address: surrounding spaces dropped, casefolded."""
+    return email.strip().casefold()
+
+
+class ContactStore:
+    """
+    All contacts of contacts.csv, read once and kept in memory.
+    Each contact gets an ID (its position in load/add order); dictionaries
+    map casefolded names, normalized phone numbers and normalized emails to
+    IDs, so lookups (and the duplicate check when adding) go straight to the
+    matching contacts instead of parsing the file.
+
+    Adds, updates and deletes are appended as one JSON line each to a change
+    log (contacts.csv.log) and replayed on top of contacts.csv when loading,
+    so an edit costs one small append instead of rewriting the file. Once
+    the log is big enough it is folded into contacts.csv on a background
+    thread (see compact()).
+    """
+
+    def __init__(self, path=CONTACTS_FILE):
+        self.path = path
+        self.log_path = path + LOG_SUFFIX
+        # the log being folded in while a compaction runs
+        self.merging_path = self.log_path + '.merging'
+        # the new contacts.csv being written; it exists until it replaces the old one
+        self.temp_path = path + '.tmp'
+        self.log_file = None
+        self.log_records = 0
+        self.compactor = None
+        self.contacts = {}      # ID -> contact dict {'Name', 'Phone', 'Email'}, in insertion order
+        self.by_name = {}       # casefolded name -> list of IDs
+        self.by_phone = {}      # normalize_phone() key -> list of IDs
+        self.by_email = {}      # normalize_email() key -> list of IDs
+        self.name_index = None  # substring/fuzzy search over the names, built by the first search
+        self.next_id = 0
+        self.loaded = False
+
+    def load(self):
+        """
+        Read contacts.csv and replay the change log (once; later calls do
+        nothing). If reading fails, nothing is kept and the next call starts
+        over, so a half-read file is never compacted over the full one.
+        """
+        if self.loaded:
+            return
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', newline='', encoding='utf-8') as file:
+                    for row in csv.DictReader(file):
+                        # short rows come back with None for the missing fields
+                        self._insert({field: row.get(field) or '' for field in FIELDNAMES})
+            # a compaction was interrupted (see compact())
+            if os.path.exists(self.merging_path):
+                if os.path.exists(self.temp_path):
+                    # contacts.csv is still the old one: finish the compaction now
+                    self._replay(self.merging_path)
+                    self._write_contacts(self.all())
+                os.remove(self.merging_path)
+            self.log_records = self._replay(self.log_path)
+        except Exception:
+            self._clear()
+            raise
+        self.loaded = True
+
+    def exists(self):
+        """True once there is a contacts file (or contacts not yet written to one)."""
+        return bool(self.contacts) or os.path.exists(self.path) or os.path.exists(self.log_path)
+
+    def all(self):
+        return list(self.contacts.values())
+
+    def find_name(self, name):
+        """First contact whose name equals `name`, ignoring case (None if there is none)."""
+        ids = self.by_name.get(name.casefold())
+        return self.contacts[ids[0]] if ids else None
+
+    def search_name(self, text, limit=None):
+        """Contacts whose name contains `text`, ignoring case, in file order (the first `limit` of them)."""
+        return [self.contacts[cid] for cid in self._names().search(text, limit)]
+
+    def fuzzy_search_name(self, text, limit=10):
+        """Up to `limit` contacts with names close to `text` (typos allowed), best match first."""
+        return [self.contacts[cid] for cid in self._names().fuzzy(text, limit)]
+
+    def find_phone(self, phone):
+        """Contacts with this phone number, however it is written."""
+        return [self.contacts[cid] for cid in self.by_phone.get(normalize_phone(phone), [])]
+
+    def find_email(self, email):
+        """Contacts with this email address, ignoring case and surrounding spaces."""
+        return [self.contacts[cid] for cid in self.by_email.get(normalize_email(email), [])]
+
+    def find_duplicate(self, phone, email):
+        """An existing contact with the same phone number or email (None if there is none)."""
+        ids = self.by_phone.get(normalize_phone(phone)) or self.by_email.get(normalize_email(email))
+        return self.contacts[ids[0]] if ids else None
+
+    def add(self, name, phone, email):
+        """
+        Add a contact and log it. The phone number is stored normalized;
+        ValueError if a field is empty, the number is not valid, or the
+        phone number or email already belongs to another contact.
+        """
+        contact = self._checked(name, phone, email)
+        self._log({'op': 'add', 'contact': contact})
+        self._insert(contact)
+        self._compact_if_due()
+        return contact
+
+    def add_many(self, rows):
+        """
+        Add a batch of contacts. `rows` is any iterable of dicts with Name,
+        Phone and Email keys (as csv.DictReader gives them) or of
+        (name, phone, email) sequences. Rows that add() would refuse, and
+        rows repeating the phone number or email of an earlier row, are
+        skipped. The rest go to the change log as one record in one write,
+        so an interrupted batch adds nothing.
+        Returns (number added, list of (row number, reason) for skipped rows).
+        """
+        contacts, rejected = [], []
+        # keys taken by earlier rows of this batch (the indexes cover existing contacts)
+        phones, emails = set(), set()
+        for number, row in enumerate(rows, 1):
+            try:
+                if isinstance(row, dict):
+                    row = [row.get(field) for field in FIELDNAMES]
+                name, phone, email = ('' if value is None else str(value) for value in row)
+            except (TypeError, ValueError):
+                rejected.append((number, "Expected Name, Phone and Email!"))
+                continue
+            try:
+                contact = self._checked(name, phone, email)
+            except ValueError as e:
+                rejected.append((number, str(e)))
+                continue
+            email_key = normalize_email(contact['Email'])
+            if contact['Phone'] in phones or email_key in emails:
+                rejected.append((number, "An earlier row has this phone number or email!"))
+                continue
+            phones.add(contact['Phone'])
+            emails.add(email_key)
+            contacts.append(contact)
+        if contacts:
+            self._log({'op': 'add_many', 'contacts': [[c['Name'], c['Phone'], c['Email']] for c in contacts]},
+                      changes=len(contacts))
+            for contact in contacts:
+                self._insert(contact)
+            self._compact_if_due()
+        return len(contacts), rejected
+
+    def update_phone(self, name, new_phone):
+        """
+        Change the phone number of the first contact named `name`; returns it
+        (None if not found). ValueError if the new number is not valid or
+        belongs to another contact.
+        """
+        ids = self.by_name.get(name.casefold())
+        if not ids:
+            return None
+        cid = ids[0]
+        new_phone = normalize_phone(new_phone)
+        if not valid_phone(new_phone):
+            raise ValueError("Invalid phone number!")
+        owners = self.by_phone.get(new_phone, [])
+        if any(owner != cid for owner in owners):
+            raise ValueError(f"Contact '{self.contacts[owners[0]]['Name']}' already has this phone number!")
+        self._log({'op': 'update', 'name': name, 'phone': new_phone})
+        contact = self._set_phone(name, new_phone)
+        self._compact_if_due()
+        return contact
+
+    def delete(self, name):
+        """Delete every contact named `name` (ignoring case); returns how many were deleted."""
+        if name.casefold() not in self.by_name:
+            return 0
+        self._log({'op': 'delete', 'name': name})
+        deleted = self._remove(name)
+        self._compact_if_due()
+        return deleted
+
+    def compact(self, wait=False):
+        """
+        Fold the change log into contacts.csv.
+        Here the log is renamed to contacts.csv.log.merging (new changes go
+        to a fresh log) and the contacts are captured; a background thread
+        then writes them to contacts.csv.tmp, replaces contacts.csv with it
+        and deletes the merging log. The empty contacts.csv.tmp is created
+        before the rename, so after a crash load() can tell whether
+        contacts.csv was already replaced: if the temp file is still there
+        it was not, and the merging log is replayed and the compaction
+        finished; otherwise the merging log is just deleted.
+        With `wait`, returns once contacts.csv is written.
+        """
+        if self.compactor is not None and self.compactor.is_alive():
+            if not wait:
+                # the log keeps growing until the running compaction is done
+                return
+            self.compactor.join()
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+        # nothing logged, or an earlier compaction failed (load() finishes it)
+        if not os.path.exists(self.log_path) or os.path.exists(self.merging_path):
+            return
+        open(self.temp_path, 'w').close()
+        self._sync_dir()
+        os.replace(self.log_path, self.merging_path)
+        self.log_records = 0
+        # contacts are never changed in place (see _set_phone), so a shallow copy is a snapshot
+        contacts = list(self.contacts.values())
+        self.compactor = threading.Thread(target=self._finish_compaction, args=(contacts,),
+                                          name='contacts-compaction')
+        self.compactor.start()
+        if wait:
+            self.compactor.join()
+
+    def close(self):
+        """Wait for a running compaction and close the change log."""
+        if self.compactor is not None:
+            self.compactor.join()
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+
+    def __len__(self):
+        return len(self.contacts)
+
+    def _log(self, record, changes=1):
+        # written (and synced) before memory changes, so a failed write changes nothing
+        if self.log_file is None:
+            self.log_file = open(self.log_path, 'a', newline='\n', encoding='utf-8')
+        self.log_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.log_file.flush()
+        os.fsync(self.log_file.fileno())
+        self.log_records += changes
+
+    def _compact_if_due(self):
+        if self.log_records >= max(COMPACT_MIN_RECORDS, len(self.contacts) // COMPACT_RATIO):
+            self.compact()
+
+    def _replay(self, path):
+        """Apply the records of a change log; returns how many changes they hold."""
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as file:
+            data = file.read()
+        lines = data.split(b'\n')
+        if lines[-1]:
+            # a record cut short by a crash: drop it so the next one starts on a fresh line
+            with open(path, 'r+b') as file:
+                file.truncate(len(data) - len(lines[-1]))
+        changes = 0
+        for line in lines[:-1]:
+            record = json.loads(line)
+            changes += 1
+            if record['op'] == 'add':
+                self._insert(record['contact'])
+            elif record['op'] == 'add_many':
+                for name, phone, email in record['contacts']:
+                    self._insert({'Name': name, 'Phone': phone, 'Email': email})
+                changes += len(record['contacts']) - 1
+            elif record['op'] == 'update':
+                self._set_phone(record['name'], record['phone'])
+            elif record['op'] == 'delete':
+                self._remove(record['name'])
+        return changes
+
+    def _finish_compaction(self, contacts):
+        # runs on the compactor thread
+        try:
+            self._write_contacts(contacts)
+            os.remove(self.merging_path)
+            self._sync_dir()
+        except Exception as e:
+            log_error("ERROR", f"Compacting {self.log_path} failed: {str(e)}")
+
+    def _write_contacts(self, contacts):
+        """Write `contacts` to contacts.csv, replacing the old file in one step."""
+        with open(self.temp_path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(contacts)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(self.temp_path, self.path)
+        self._sync_dir()
+
+    def _sync_dir(self):
+        # makes renames in the folder durable; folders cannot be opened this way on Windows
+        if os.name != 'posix':
+            return
+        fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _checked(self, name, phone, email):
+        """The contact to store for these fields; ValueError if add() must refuse them."""
+        name, email = name.strip(), email.strip()
+        if not name or not phone.strip() or not email:
+            raise ValueError("All fields (Name, Phone, Email) are required!")
+        phone = normalize_phone(phone)
+        if not valid_phone(phone):
+            raise ValueError("Invalid phone number!")
+        # both keys are normalized by now, so no find_duplicate()
+        ids = self.by_phone.get(phone) or self.by_email.get(normalize_email(email))
+        if ids:
+            raise ValueError(f"Contact '{self.contacts[ids[0]]['Name']}' already has this phone number or email!")
+        return {'Name': name, 'Phone': phone, 'Email': email}
+
+    def _clear(self):
+        # back to the state of a store that was never loaded
+        self.contacts = {}
+        self.by_name = {}
+        self.by_phone = {}
+        self.by_email = {}
+        self.name_index = None
+        self.next_id = 0
+        self.log_records = 0
+
+    def _set_phone(self, name, phone):
+        cid = self.by_name[name.casefold()][0]
+        contact = self.contacts[cid]
+        # only the phone index changes
+        self._drop(self.by_phone, normalize_phone(contact['Phone']), cid)
+        # a new dict, so snapshots taken by compact() keep the old one
+        contact = self.contacts[cid] = dict(contact, Phone=phone)
+        self.by_phone.setdefault(phone, []).append(cid)
+        return contact
+
+    def _remove(self, name):
+        ids = list(self.by_name.get(name.casefold(), []))
+        for cid in ids:
+            self._unindex(cid, self.contacts.pop(cid))
+            if self.name_index is not None:
+                self.name_index.remove(cid)
+        return len(ids)
+
+    def _insert(self, contact):
+        cid = self.next_id
+        self.next_id += 1
+        self.contacts[cid] = contact
+        self._index(cid, contact)
+        if self.name_index is not None:
+            self.name_index.add(cid, contact['Name'])
+        return cid
+
+    def _index(self, cid, contact):
+        # rows written before normalization are keyed the same way as new ones
+        self.by_name.setdefault(contact['Name'].casefold(), []).append(cid)
+        phone, email = normalize_phone(contact['Phone']), normalize_email(contact['Email'])
+        # blank phones/emails are not keys (they would all look like duplicates)
+        if phone:
+            self.by_phone.setdefault(phone, []).append(cid)
+        if email:
+            self.by_email.setdefault(email, []).append(cid)
+
+    def _unindex(self, cid, contact):
+        self._drop(self.by_name, contact['Name'].casefold(), cid)
+        self._drop(self.by_phone, normalize_phone(contact['Phone']), cid)
+        self._drop(self.by_email, normalize_email(contact['Email']), cid)
+
+    def _names(self):
+        # loading and bulk imports do not need the name index, and building it
+        # costs more than the rest of the indexes together
+        if self.name_index is None:
+            self.name_index = NameIndex()
+            for cid, contact in self.contacts.items():
+                self.name_index.add(cid, contact['Name'])
+        return self.name_index
+
+    @staticmethod
+    def _drop(index, key, cid):
+        if not key:
+            return
+        ids = index[key]
+        ids.remove(cid)
+        if not ids:
+            del index[key]
+
+
+def read_contacts_file(path):
+    """
+    Yield the contacts of a CSV file with a Name,Phone,Email header (like
+    contacts.csv) or of a JSON file holding a list of such objects (like
+    contacts.json). CSV rows are read as they are needed.
+    """
+    if path.lower().endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as file:
+            yield from json.load(file)
+    else:
+        # utf-8-sig: spreadsheets often start the file with a byte order mark
+        with open(path, 'r', newline='', encoding='utf-8-sig') as file:
+            yield from csv.DictReader(file)
+
+
+# The one store behind all menu actions, loaded on first use
+store = ContactStore()
+
+
+def get_store():
+    """Return the shared ContactStore, reading contacts.csv the first time."""
+    store.load()
+    return store
+
 
 # ============================================================================
 # TASK 2: CREATE AND SAVE CONTACTS
 # ============================================================================
 def create_contact():
     """
-    Accept contact details from user and save to CSV file.
+    Accept contact details from user and save them.
     This function prompts for name, phone, and email, validates the input,
-    and stores the contact in contacts.csv file.
+    and stores the contact; it keeps asking until the user is done.
     """
     try:
         # Display section header with color
@@ -60,48 +630,25 @@ def create_contact():
         print(f"           ADD NEW CONTACT")
         print(f"{'='*60}{Colors.RESET}")
         
-        # Prompt user for contact details with colored prompts
-        print(f"\n{Colors.YELLOW}Please enter the contact details:{Colors.RESET}")
-        name = input(f"{Colors.WHITE}Name: {Colors.RESET}").strip()
-        phone = input(f"{Colors.WHITE}Phone Number: {Colors.RESET}").strip()
-        email = input(f"{Colors.WHITE}Email Address: {Colors.RESET}").strip()
-        
-        # Validate inputs - ensure all fields are filled
-        if not name or not phone or not email:
-            raise ValueError("All fields (Name, Phone, Email) are required!")
-        
-        # Store contact as dictionary (key-value pairs)
-        contact = {
-            "Name": name,
-            "Phone": phone,
-            "Email": email
-        }
-        
-        # Check if CSV file already exists
-        file_exists = os.path.exists('contacts.csv')
-        
-        # Open CSV file in append mode to add new contact
-        with open('contacts.csv', 'a', newline='', encoding='utf-8') as file:
-            fieldnames = ['Name', 'Phone', 'Email']
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
+        # Loop (not recursion) so long sessions cannot hit the recursion limit
+        while True:
+            # Prompt user for contact details with colored prompts
+            print(f"\n{Colors.YELLOW}Please enter the contact details:{Colors.RESET}")
+            name = input(f"{Colors.WHITE}Name: {Colors.RESET}").strip()
+            phone = input(f"{Colors.WHITE}Phone Number: {Colors.RESET}").strip()
+            email = input(f"{Colors.WHITE}Email Address: {Colors.RESET}").strip()
             
-            # Write header row only if file is newly created
-            if not file_exists:
-                writer.writeheader()
+            # Add to the store, which checks every field is filled, normalizes
+            # the phone, rejects duplicates (same phone or email) and logs the contact
+            get_store().add(name, phone, email)
             
-            # Write the contact data to CSV
-            writer.writerow(contact)
-        
-        # Display success message with green color
-        print(f"\n{Colors.GREEN}SUCCESS: Contact '{Colors.BOLD}{name}{Colors.RESET}{Colors.GREEN}' added successfully!{Colors.RESET}")
-        
-        # Log the successful operation
-        log_error("INFO", f"Contact '{name}' added successfully")
-        
-        # Ask if user wants to add another contact (interactive feature)
-        another = input(f"\n{Colors.YELLOW}Add another contact? (y/n): {Colors.RESET}").strip().lower()
-        if another == 'y':
-            create_contact()  # Recursive call for continuous adding
+            # Display success message with green color
+            print(f"\n{Colors.GREEN}SUCCESS: Contact '{Colors.BOLD}{name}{Colors.RESET}{Colors.GREEN}' added successfully!{Colors.RESET}")
+            
+            # Ask if user wants to add another contact (interactive feature)
+            another = input(f"\n{Colors.YELLOW}Add another contact? (y/n): {Colors.RESET}").strip().lower()
+            if another != 'y':
+                break
         
     except Exception as e:
         # Log the error to error_log.txt
@@ -115,44 +662,43 @@ def create_contact():
 # ============================================================================
 def display_contacts():
     """
-    Read contacts from CSV file and display in tabular format.
+    Display all contacts from the store in tabular format.
     Includes proper exception handling for file not found and empty files.
     """
     try:
-        # Check if contacts.csv file exists
-        if not os.path.exists('contacts.csv'):
+        # Check if there are any contacts saved
+        contact_store = get_store()
+        if not contact_store.exists():
             raise FileNotFoundError("No contacts file found. Please add contacts first.")
         
-        # Open and read the CSV file
-        with open('contacts.csv', 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            contacts = list(reader)  # Convert to list to check length
-            
-            # Check if file is empty
-            if not contacts:
-                print(f"\n{Colors.YELLOW}Warning: Contact list is empty!{Colors.RESET}")
-                return
-            
-            # Display header with attractive formatting
-            print(f"\n{Colors.BLUE}{Colors.BOLD}{'='*80}")
-            print(f"                    ALL CONTACTS")
-            print(f"{'='*80}{Colors.RESET}")
-            
-            # Table header with cyan color
-            print(f"{Colors.CYAN}{Colors.BOLD}")
-            print(f"{'Name':<30} {'Phone':<20} {'Email':<30}")
-            print(f"{'-'*80}{Colors.RESET}")
-            
-            # Display each contact with alternating colors for better readability
-            for idx, contact in enumerate(contacts):
-                # Alternate between white and cyan for each row
-                color = Colors.WHITE if idx % 2 == 0 else Colors.CYAN
-                print(f"{color}{contact['Name']:<30} {contact['Phone']:<20} {contact['Email']:<30}{Colors.RESET}")
-            
-            # Display footer with total count
-            print(f"{Colors.BLUE}{Colors.BOLD}{'-'*80}")
-            print(f"Total Contacts: {Colors.GREEN}{len(contacts)}{Colors.RESET}")
-            print(f"{Colors.BLUE}{'='*80}{Colors.RESET}\n")
+        # Contacts are already in memory; no need to re-read the CSV
+        contacts = contact_store.all()
+        
+        # Check if file is empty
+        if not contacts:
+            print(f"\n{Colors.YELLOW}Warning: Contact list is empty!{Colors.RESET}")
+            return
+        
+        # Display header with attractive formatting
+        print(f"\n{Colors.BLUE}{Colors.BOLD}{'='*80}")
+        print(f"                    ALL CONTACTS")
+        print(f"{'='*80}{Colors.RESET}")
+        
+        # Table header with cyan color
+        print(f"{Colors.CYAN}{Colors.BOLD}")
+        print(f"{'Name':<30} {'Phone':<20} {'Email':<30}")
+        print(f"{'-'*80}{Colors.RESET}")
+        
+        # Display each contact with alternating colors for better readability
+        for idx, contact in enumerate(contacts):
+            # Alternate between white and cyan for each row
+            color = Colors.WHITE if idx % 2 == 0 else Colors.CYAN
+            print(f"{color}{contact['Name']:<30} {contact['Phone']:<20} {contact['Email']:<30}{Colors.RESET}")
+        
+        # Display footer with total count
+        print(f"{Colors.BLUE}{Colors.BOLD}{'-'*80}")
+        print(f"Total Contacts: {Colors.GREEN}{len(contacts)}{Colors.RESET}")
+        print(f"{Colors.BLUE}{'='*80}{Colors.RESET}\n")
             
     except FileNotFoundError as e:
         # Log and display file not found error
@@ -171,12 +717,14 @@ def display_contacts():
 # -------------------- SEARCH CONTACT --------------------
 def search_contact():
     """
-    Search for a contact by name (case-insensitive, partial match).
+    Search for a contact by name (case-insensitive, partial match), or look
+    one up by exact phone number or email address.
     Displays all matching contacts with their full details.
     """
     try:
         # Check if contacts file exists
-        if not os.path.exists('contacts.csv'):
+        contact_store = get_store()
+        if not contact_store.exists():
             raise FileNotFoundError("No contacts file found.")
         
         # Display search header
@@ -185,28 +733,40 @@ def search_contact():
         print(f"{'='*60}{Colors.RESET}")
         
         # Get search term from user
-        search_name = input(f"\n{Colors.YELLOW}Enter name to search: {Colors.RESET}").strip()
+        search_name = input(f"\n{Colors.YELLOW}Enter name, phone or email to search: {Colors.RESET}").strip()
         
-        # Read all contacts from CSV
-        with open('contacts.csv', 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            contacts = list(reader)
-            
-            found = False
-            # Search through contacts (case-insensitive)
-            for contact in contacts:
-                if search_name.lower() in contact['Name'].lower():
-                    # Display matching contact with cyan color
-                    print(f"\n{Colors.CYAN}{Colors.BOLD}{'='*60}")
-                    print(f"Name:  {Colors.WHITE}{contact['Name']}{Colors.RESET}")
-                    print(f"{Colors.CYAN}Phone: {Colors.WHITE}{contact['Phone']}{Colors.RESET}")
-                    print(f"{Colors.CYAN}Email: {Colors.WHITE}{contact['Email']}{Colors.RESET}")
-                    print(f"{Colors.CYAN}{Colors.BOLD}{'='*60}{Colors.RESET}")
-                    found = True
-            
-            # If no matches found
-            if not found:
-                print(f"\n{Colors.YELLOW}No contact found with name '{search_name}'{Colors.RESET}")
+        # An email or phone number goes straight to its index; anything else
+        # searches the names held by the store (case-insensitive)
+        by_email = '@' in search_name
+        by_phone = not by_email and valid_phone(normalize_phone(search_name)) \
+            and not any(c.isalpha() for c in search_name)
+        if by_email:
+            matches = contact_store.find_email(search_name)
+        elif by_phone:
+            matches = contact_store.find_phone(search_name)
+        else:
+            # one more than is shown, to tell whether there are more
+            matches = contact_store.search_name(search_name, SEARCH_RESULTS + 1)
+        for contact in matches[:SEARCH_RESULTS]:
+            # Display matching contact with cyan color
+            print(f"\n{Colors.CYAN}{Colors.BOLD}{'='*60}")
+            print(f"Name:  {Colors.WHITE}{contact['Name']}{Colors.RESET}")
+            print(f"{Colors.CYAN}Phone: {Colors.WHITE}{contact['Phone']}{Colors.RESET}")
+            print(f"{Colors.CYAN}Email: {Colors.WHITE}{contact['Email']}{Colors.RESET}")
+            print(f"{Colors.CYAN}{Colors.BOLD}{'='*60}{Colors.RESET}")
+        if len(matches) > SEARCH_RESULTS:
+            print(f"\n{Colors.YELLOW}Showing the first {SEARCH_RESULTS} matches; type more of the name to narrow the search.{Colors.RESET}")
+        
+        # If no matches found, suggest the closest names (typos allowed)
+        if not matches and (by_email or by_phone):
+            print(f"\n{Colors.YELLOW}No contact found with {'email' if by_email else 'phone'} '{search_name}'{Colors.RESET}")
+        elif not matches:
+            print(f"\n{Colors.YELLOW}No contact found with name '{search_name}'{Colors.RESET}")
+            suggestions = contact_store.fuzzy_search_name(search_name, SUGGESTIONS)
+            if suggestions:
+                print(f"{Colors.YELLOW}Did you mean:{Colors.RESET}")
+                for contact in suggestions:
+                    print(f"{Colors.WHITE}  {contact['Name']:<30} {contact['Phone']:<20}{Colors.RESET}")
                 
     except Exception as e:
         # Log and display error
@@ -222,7 +782,8 @@ def update_contact():
     """
     try:
         # Check if contacts file exists
-        if not os.path.exists('contacts.csv'):
+        contact_store = get_store()
+        if not contact_store.exists():
             raise FileNotFoundError("No contacts file found.")
         
         # Display update header
@@ -233,39 +794,24 @@ def update_contact():
         # Get contact name to update
         name = input(f"\n{Colors.YELLOW}Enter name of contact to update: {Colors.RESET}").strip()
         
-        # Read all contacts from CSV
-        with open('contacts.csv', 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            contacts = list(reader)
-        
-        updated = False
-        # Find and update the contact
-        for contact in contacts:
-            if contact['Name'].lower() == name.lower():
-                # Display current phone number
-                print(f"{Colors.CYAN}Current Phone: {contact['Phone']}{Colors.RESET}")
-                
-                # Get new phone number
-                new_phone = input(f"{Colors.YELLOW}Enter new phone number: {Colors.RESET}").strip()
-                contact['Phone'] = new_phone
-                updated = True
-                
-                # Display success message
-                print(f"\n{Colors.GREEN}SUCCESS: Contact '{Colors.BOLD}{name}{Colors.RESET}{Colors.GREEN}' updated successfully!{Colors.RESET}")
-                log_error("INFO", f"Contact '{name}' updated")
-                break
+        # Find the contact through the name index
+        contact = contact_store.find_name(name)
         
         # If contact not found
-        if not updated:
+        if not contact:
             print(f"\n{Colors.YELLOW}No contact found with name '{name}'{Colors.RESET}")
             return
         
-        # Write updated contacts back to CSV file
-        with open('contacts.csv', 'w', newline='', encoding='utf-8') as file:
-            fieldnames = ['Name', 'Phone', 'Email']
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(contacts)
+        # Display current phone number
+        print(f"{Colors.CYAN}Current Phone: {contact['Phone']}{Colors.RESET}")
+        
+        # Get new phone number; the store updates its indexes and logs the change
+        new_phone = input(f"{Colors.YELLOW}Enter new phone number: {Colors.RESET}").strip()
+        contact_store.update_phone(name, new_phone)
+        
+        # Display success message
+        print(f"\n{Colors.GREEN}SUCCESS: Contact '{Colors.BOLD}{name}{Colors.RESET}{Colors.GREEN}' updated successfully!{Colors.RESET}")
+        log_error("INFO", f"Contact '{name}' updated")
             
     except Exception as e:
         # Log and display error
@@ -281,7 +827,8 @@ def delete_contact():
     """
     try:
         # Check if contacts file exists
-        if not os.path.exists('contacts.csv'):
+        contact_store = get_store()
+        if not contact_store.exists():
             raise FileNotFoundError("No contacts file found.")
         
         # Display delete header
@@ -292,17 +839,8 @@ def delete_contact():
         # Get contact name to delete
         name = input(f"\n{Colors.YELLOW}Enter name of contact to delete: {Colors.RESET}").strip()
         
-        # Read all contacts from CSV
-        with open('contacts.csv', 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            contacts = list(reader)
-        
         # Find the contact to display before deletion
-        contact_to_delete = None
-        for contact in contacts:
-            if contact['Name'].lower() == name.lower():
-                contact_to_delete = contact
-                break
+        contact_to_delete = contact_store.find_name(name)
         
         # If contact not found
         if not contact_to_delete:
@@ -322,16 +860,8 @@ def delete_contact():
             print(f"\n{Colors.YELLOW}Deletion cancelled.{Colors.RESET}")
             return
         
-        # Remove the contact from list
-        original_count = len(contacts)
-        contacts = [c for c in contacts if c['Name'].lower() != name.lower()]
-        
-        # Write updated contacts back to CSV file
-        with open('contacts.csv', 'w', newline='', encoding='utf-8') as file:
-            fieldnames = ['Name', 'Phone', 'Email']
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(contacts)
+        # Remove every contact with that name; the store logs the deletion
+        contact_store.delete(name)
         
         # Display success message
         print(f"\n{Colors.GREEN}SUCCESS: Contact '{Colors.BOLD}{name}{Colors.RESET}{Colors.GREEN}' deleted successfully!{Colors.RESET}")
@@ -355,7 +885,8 @@ def export_to_json():
     """
     try:
         # Check if contacts file exists
-        if not os.path.exists('contacts.csv'):
+        contact_store = get_store()
+        if not contact_store.exists():
             raise FileNotFoundError("No contacts file found.")
         
         # Display export header
@@ -363,10 +894,8 @@ def export_to_json():
         print(f"           EXPORT TO JSON")
         print(f"{'='*60}{Colors.RESET}")
         
-        # Read contacts from CSV
-        with open('contacts.csv', 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            contacts = list(reader)
+        # Contacts come from the store's memory
+        contacts = contact_store.all()
         
         # Check if there are contacts to export
         if not contacts:
@@ -476,6 +1005,101 @@ def log_error(level, message):
         print(f"{Colors.YELLOW}⚠ Warning: Could not write to log file: {str(e)}{Colors.RESET}")
 
 
+# ============================================================================
+# BULK IMPORT
+# ============================================================================
+def import_contacts(path):
+    """
+    Add all contacts of a CSV or JSON file in one batch (--import FILE).
+    Prints how many were added and why rows were skipped.
+    """
+    try:
+        contact_store = get_store()
+        start = time.perf_counter()
+        added, rejected = contact_store.add_many(read_contacts_file(path))
+        # wait for a compaction the import may have started
+        contact_store.close()
+        
+        print(f"{Colors.GREEN}SUCCESS: {Colors.BOLD}{added}{Colors.RESET}{Colors.GREEN} contacts imported from '{path}' "
+              f"in {time.perf_counter() - start:.1f}s{Colors.RESET}")
+        if rejected:
+            print(f"{Colors.YELLOW}Skipped {len(rejected)} rows:{Colors.RESET}")
+            for number, reason in rejected[:SHOW_REJECTED]:
+                print(f"{Colors.WHITE}  row {number}: {reason}{Colors.RESET}")
+            if len(rejected) > SHOW_REJECTED:
+                print(f"{Colors.WHITE}  ... and {len(rejected) - SHOW_REJECTED} more{Colors.RESET}")
+        log_error("INFO", f"Imported {added} contacts from {path} ({len(rejected)} rows skipped)")
+        
+    except Exception as e:
+        # Log and display error
+        log_error("ERROR", f"Error importing contacts: {str(e)}")
+        print(f"{Colors.RED}ERROR: {str(e)}{Colors.RESET}")
+
+
+# ============================================================================
+# SEARCH BENCHMARK
+# ============================================================================
+def benchmark_search(count, queries=200, seed=42):
+    """
+    Compare the indexed name search with the old linear scan
+    (`text.lower() in name.lower()` on every contact) on `count` generated
+    contacts. Nothing is written to disk.
+    """
+    rng = random.Random(seed)
+    syllables = ['ra', 'me', 'sh', 'ku', 'mar', 'an', 'ya', 'pri', 'ti', 'lo', 'vi', 'jay',
+                 'de', 'son', 'li', 'na', 'ro', 'sa', 'ka', 'ha', 'ne', 'el', 'tor', 'ben']
+
+    def word():
+        return ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 3))).capitalize()
+
+    contact_store = ContactStore(path=os.devnull)
+    start = time.perf_counter()
+    for i in range(count):
+        contact_store._insert({'Name': f"{word()} {word()}", 'Phone': str(9000000000 + i),
+                               'Email': f"user{i}@example.com"})
+    contact_store._names()
+    build_seconds = time.perf_counter() - start
+    contacts = contact_store.all()
+
+    # substrings of existing names (hits), plus a few that match nothing
+    texts = []
+    for _ in range(queries):
+        name = rng.choice(contacts)['Name']
+        begin = rng.randrange(len(name) - 3)
+        texts.append(name[begin:begin + rng.randint(3, 6)])
+    texts[::10] = ['zqx' + t for t in texts[::10]]
+
+    def timed(search):
+        start = time.perf_counter()
+        for text in texts:
+            search(text)
+        return (time.perf_counter() - start) / len(texts) * 1000
+
+    def linear(text):
+        return [c for c in contacts if text.lower() in c['Name'].lower()]
+
+    # same answers from both
+    for text in texts[:20]:
+        assert linear(text) == contact_store.search_name(text), text
+    results = [
+        ("linear scan", timed(linear)),
+        ("trigram index", timed(contact_store.search_name)),
+        ("trigram index, limit 10", timed(lambda text: contact_store.search_name(text, limit=10))),
+        ("fuzzy, limit 10", timed(lambda text: contact_store.fuzzy_search_name(text, limit=10))),
+    ]
+    # whole names with one letter replaced: no exact match, so fuzzy has to rank
+    texts = []
+    for _ in range(queries):
+        name = rng.choice(contacts)['Name']
+        typo = rng.randrange(len(name))
+        texts.append(name[:typo] + 'q' + name[typo + 1:])
+    results.append(("fuzzy with a typo, limit 10", timed(lambda text: contact_store.fuzzy_search_name(text, limit=10))))
+    print(f"{count} contacts ({len(contact_store.by_name)} distinct names), index built in {build_seconds:.1f}s")
+    print(f"{'search':<28} {'ms/query':>10}")
+    for label, ms in results:
+        print(f"{label:<28} {ms:>10.3f}")
+
+
 # ============================================================================
 # MAIN MENU AND APPLICATION ENTRY POINT
 # ============================================================================
@@ -527,6 +1151,7 @@ def main():
             print(f"     Thank you for using Contact Book Management System!")
             print(f"{'='*70}{Colors.RESET}\n")
             log_error("INFO", "Application closed")
+            store.close()  # Let a running compaction finish
             break  # Exit the while loop
         else:
             # Handle invalid input
@@ -540,7 +1165,22 @@ if __name__ == "__main__":
     """
     This block executes only when the script is run directly.
     Logs application start and calls the main function.
+    With --bench N, runs the search benchmark on N contacts instead;
+    with --import FILE, adds the contacts in FILE and exits.
     """
+    parser = argparse.ArgumentParser(description="Contact Book Management System")
+    parser.add_argument('--bench', type=int, metavar='N',
+                        help="benchmark name search on N generated contacts and exit")
+    parser.add_argument('--import', dest='import_file', metavar='FILE',
+                        help="add the contacts in a CSV or JSON file and exit")
+    args = parser.parse_args()
+    if args.bench:
+        benchmark_search(args.bench)
+        raise SystemExit
+    if args.import_file:
+        import_contacts(os.path.join(START_DIR, args.import_file))
+        raise SystemExit
+    
     # Log application start
     log_error("INFO", "Application started")
     